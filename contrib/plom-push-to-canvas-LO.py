@@ -61,6 +61,7 @@ the "TA Grader" role: https://gitlab.com/plom/plom/-/issues/2338
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import os
 from pathlib import Path
 from typing import Iterable
@@ -90,7 +91,7 @@ from plom.canvas import (
     get_sis_id_to_sub_and_name_table
 )
 
-from canvasapi.exceptions import CanvasException
+from canvasapi.exceptions import CanvasException, RateLimitExceeded
 
 # bump this a bit if you change this script
 __script_version__ = "0.2.4"
@@ -210,7 +211,7 @@ def assignment_submitter(assignment, section=None, rubric_headers=None,
     print("    done.")
 
     print("  Getting canvasapi submission objects...")
-    subs = assignment.get_submissions()
+    subs = assignment.get_submissions(per_page=100)
     print("    done.")
 
     print("  Getting another classlist and various conversion tables...")
@@ -249,8 +250,20 @@ def assignment_submitter(assignment, section=None, rubric_headers=None,
     if move_files_after_submission:
         os.makedirs(os.path.join(reassembled_dir, push_subdir), exist_ok=True)
 
-    def wait():
-        time.sleep(random.uniform(0.25, 0.5))
+    def backoff(f, *args, **kwargs):
+        """Call f, waiting longer and longer while Canvas says we're going too fast.
+
+        Canvas throttles each API key, so rather than sleeping after every
+        call, only slow down (with some jitter) when it tells us to.
+        """
+        delay = 0.5
+        for _ in range(6):
+            try:
+                return f(*args, **kwargs)
+            except RateLimitExceeded:
+                time.sleep(delay * random.uniform(1, 2))
+                delay *= 2
+        return f(*args, **kwargs)
 
     def push_to_canvas(sis_id, comments=None, submission_files=None, dry_run=False):
         ##TODO: move files after upload
@@ -281,7 +294,6 @@ def assignment_submitter(assignment, section=None, rubric_headers=None,
         if move_files_after_submission:
             files_to_move = set()
         # TODO: should look at the return values
-        # TODO: back off on canvasapi.exception.RateLimitExceeded?
         if comments:
             comments = comments if isinstance(comments, Iterable) else [comments]
             for c in comments:
@@ -289,15 +301,13 @@ def assignment_submitter(assignment, section=None, rubric_headers=None,
                     not_pushed.append(c.name)
                 else:
                     try:
-                        sub.upload_comment(c)
+                        backoff(sub.upload_comment, c)
                         if move_files_after_submission: #TODO: think about handling mulitple files properly, more important for the submission file...
                             files_to_move.add(c)
                     except CanvasException as e:
                         print(e)
                         not_pushed.append(c.name)
 
-                    wait()
-
         if submission_files:
             submission_files = submission_files if isinstance(submission_files, Iterable) else [submission_files]
             # ids = []
@@ -332,8 +342,7 @@ def assignment_submitter(assignment, section=None, rubric_headers=None,
                 rubric_assessment = {rubric_id:{'rating_id': rating_id[float(mark)], 'points': mark} for rubric_id, rating_id, mark in zip(rubric_ids, rating_ids, rubric_marks)}
                 sub_data['rubric_assessment'] = rubric_assessment
             try:
-                new_sub = sub.edit(**sub_data)
-                wait()
+                new_sub = backoff(sub.edit, **sub_data)
                 
                 if move_files_after_submission:
                     for f in files_to_move:
@@ -434,18 +443,33 @@ if __name__ == "__main__":
 
     timeouts = []
     upload_comment = True
-    for pdf in tqdm(Path("reassembled").glob("*.pdf")):
 
+    # Check every filename before pushing anything, so a bad one stops us
+    # before any grades are posted.
+    pdfs = []
+    for pdf in sorted(Path("reassembled").glob("*.pdf")):
         sis_id = pdf.stem.split("_")[1]
 
         assert len(sis_id) == 8
         assert set(sis_id) <= set(string.digits)
+        pdfs.append((pdf, sis_id))
 
+    def submit_pdf(pdf_and_sis_id):
+        pdf, sis_id = pdf_and_sis_id
         comment = pdf if upload_comment else None
-        msg = submit(sis_id, comments = comment, dry_run = args.dry_run)
-
-        if msg:
-            timeouts.extend(msg)
+        try:
+            return submit(sis_id, comments = comment, dry_run = args.dry_run)
+        except Exception as e:
+            # don't lose track of the others: report this one at the end
+            print(f"Failed to push {pdf.name}: {e!r}")
+            return [(pdf.name, sis_id, "?")]
+
+    # Each student is a few independent round-trips to Canvas: keep several
+    # students in flight at once, `backoff` slows us down if Canvas objects.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for msg in tqdm(executor.map(submit_pdf, pdfs), total=len(pdfs)):
+            if msg:
+                timeouts.extend(msg)
 
     if args.dry_run:
         print("Done with DRY-RUN.  The following data would have been uploaded:")
@@ -268,7 +268,7 @@ if __name__ == "__main__":
         student_list = get_student_list(course)
     print("    done.")
     print("  Getting canvasapi submission objects...")
-    subs = assignment.get_submissions()
+    subs = assignment.get_submissions(per_page=100)
     print("    done.")
 
     print("  Getting another classlist and various conversion tables...")
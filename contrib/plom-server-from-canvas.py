@@ -36,10 +36,10 @@ import argparse
 import csv
 import os
 from pathlib import Path
-import random
 import string
 import subprocess
 from textwrap import dedent
+import threading
 import time
 
 import fitz
@@ -71,27 +71,61 @@ from plom.create import start_messenger
 # bump this a bit if you change this script
 __script_version__ = "0.4.0"
 
+_DIGITS = frozenset(string.digits)
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
+
+class TokenBucket:
+    """A simple token-bucket rate limiter.
+
+    Allows bursts of up to ``capacity`` calls, refilling at ``rate``
+    tokens per second.  :meth:`acquire` only sleeps when the bucket is
+    empty.  Safe to share between threads.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self._last = time.monotonic()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+
+# Try to avoid overheating the canvas api: a few requests per second
+canvas_rate_limit = TokenBucket(rate=5)
+
 
 def get_short_name(long_name):
     """
     Generate the short name of assignment
     """
-    short_name = ""
+    short_name = []
     push_letter = True
-    while len(long_name):
-        char, long_name = long_name[0], long_name[1:]
-        if char in string.digits:
+    for char in long_name:
+        if char in _DIGITS:
             push_letter = True
-            short_name += char
-        elif push_letter and char in string.ascii_letters:
+            short_name.append(char)
+        elif push_letter and char in _ASCII_LETTERS:
             push_letter = False
-            short_name += char.lower()
+            short_name.append(char.lower())
         elif char == " ":
             push_letter = True
-        else:
-            continue
 
-    return short_name
+    return "".join(short_name)
 
 
 def make_toml(assignment, marks, *, dur="."):
@@ -219,19 +253,18 @@ def get_submissions(
     for_plom.mkdir(exist_ok=True, parents=True)
 
     print("Fetching & preprocessing submissions...")
-    subs = assignment.get_submissions()
+    subs = assignment.get_submissions(per_page=100)
 
     unsubmitted = []
     timeouts = []
     errors = []
     for sub in tqdm(subs):
-        # Try to avoid overheating the canvas api (this is soooooo dumb lol)
-        time.sleep(random.uniform(0.5, 1.0))
         if name_by_info:
-            canvas_id = sub.user_id
-            stud_name, stud_sis_id = conversion[str(canvas_id)]
-            last_name, first_name = [name.strip() for name in stud_name.split(",")]
-            sub_name = f"{last_name}_{first_name}.{stud_sis_id}._".replace(" ", "_")
+            stud_name, stud_sis_id = conversion[str(sub.user_id)]
+            last_name, first_name = (
+                name.strip().replace(" ", "_") for name in stud_name.split(",")
+            )
+            sub_name = f"{last_name}_{first_name}.{stud_sis_id}._"
         else:
             sub_name = f"{sub.user_id}"
 
@@ -274,7 +307,6 @@ def get_submissions(
                 filename.touch()
                 continue
 
-            time.sleep(random.uniform(0.5, 1.5))
             # TODO: try catch to a timeout/failed list?
 
             print("*** TODO: Investigate URL property of object more carefully")
@@ -283,6 +315,7 @@ def get_submissions(
                 # TODO: does this belong in the error list or not?  Under what
                 # circumstances does it not have a url property?
                 continue
+            canvas_rate_limit.acquire()
             r = requests.get(obj.url)
             with open(filename, "wb") as f:
                 f.write(r.content)
@@ -304,16 +337,18 @@ def get_submissions(
             attachment_filenames[0].rename(final_name)
         else:
             # TODO: stitching not ideal: prefer bundles from original files
-            doc = fitz.Document()
-            for f in attachment_filenames:
-                try:
-                    doc.insert_pdf(fitz.open(f))
-                except RuntimeError:
-                    print(f"We had problems with {sub} because of error on {f}")
-                    errors.append(sub)
-            # TODO: this could easily fail if we failed to the insertions above
-            # TODO: anyway, like I said above, stitching not ideal
-            doc.save(final_name)
+            with fitz.Document() as doc:
+                for f in attachment_filenames:
+                    try:
+                        # close each source promptly rather than leaking handles
+                        with fitz.open(f) as src:
+                            doc.insert_pdf(src)
+                    except RuntimeError:
+                        print(f"We had problems with {sub} because of error on {f}")
+                        errors.append(sub)
+                # TODO: this could easily fail if we failed to the insertions above
+                # TODO: anyway, like I said above, stitching not ideal
+                doc.save(final_name, garbage=3, deflate=True)
             # Clean up temporary files (TODO: for now we leave them)
             # for x in attachment_filenames:
             #    x.unlink()
@@ -348,123 +383,123 @@ def scan_submissions(
     if not server:
         server = os.environ["PLOM_SERVER"]
 
-    if True:  # "PDLPATCH" in os.environ:
-        # It seems like the student ID's from the classlist
-        # have not yet been attached to numbered test papers
-        # when we arrive at this point. Let's plan to make
-        # such attachments just-in-time, and keep track of
-        # which test papers we use with a list of Booleans.
-        print("*** PDLPATCH: Creating a list of Booleans for test papers.")
-
-        # We are also going to need a mapping from SID's to student names
-        # and test numbers.
-        # These don't seem to be in the database yet, either, so just
-        # read the class list.
-        sid2name = {}
-        sid2test = {}
-        # TODO: hardcoded, use API instead
-        with open(server_dir / "specAndDatabase/classlist.csv", "r") as csvfile:
-            reader = csv.DictReader(csvfile)
-            classlist = list(reader)
-
-        for k in range(len(classlist)):
-            sid2name[classlist[k]["id"]] = classlist[k]["name"]
-            sid2test[classlist[k]["id"]] = int(classlist[k]["paper_number"])
-
-        # Ask the server for the largest paper number we might see.
-        # Inferring this from len(sid2name) might work, but doing
-        # the extra work might make this robust against incorrect assumptions.
-        mm = start_messenger(server, manager_pwd)
-        # TODO: later
-        # mm.IDgetClasslist()
-        infodict = mm.get_exam_info()
-        mm.closeUser()
-        mm.stop()
-        PaperUsed = [False for _ in range(1, infodict["current_largest_paper_num"] + 1)]
-        print(f"*** PDLPATCH: List PaperUsed has length {len(PaperUsed)}.")
-
-    print("Applying `plom-hwscan` to pdfs...")
-    for pdf in tqdm((upload_dir / "submittedHWByQ").glob("*.pdf")):
-        # get 12345678 from blah_blah.blah_blah.12345678._.
-        sid = pdf.stem.split(".")[-2]
-        try:
-            assert len(sid) == 8, "Student id has unexpected length, continuing"
-        except AssertionError as e:
-            errors.append((sid, e))
-            continue
-
-        # try to open pdf first, continue on error
-        try:
-            num_pages = len(fitz.open(pdf))
-        except RuntimeError as e:
-            print(f"Error processing student {sid} due to file error on {pdf}")
-            errors.append((sid, e))
-            continue
+    # One manager login shared by the whole loop, rather than one per paper
+    mm = start_messenger(server, manager_pwd)
+    try:
+        if True:  # "PDLPATCH" in os.environ:
+            # It seems like the student ID's from the classlist
+            # have not yet been attached to numbered test papers
+            # when we arrive at this point. Let's plan to make
+            # such attachments just-in-time, and keep track of
+            # which test papers we use with a list of Booleans.
+            print("*** PDLPATCH: Creating a list of Booleans for test papers.")
+
+            # We are also going to need a mapping from SID's to student names
+            # and test numbers.
+            # These don't seem to be in the database yet, either, so just
+            # read the class list.
+            sid2name = {}
+            sid2test = {}
+            # TODO: hardcoded, use API instead
+            with open(server_dir / "specAndDatabase/classlist.csv", "r") as csvfile:
+                reader = csv.DictReader(csvfile)
+                classlist = list(reader)
+
+            for k in range(len(classlist)):
+                sid2name[classlist[k]["id"]] = classlist[k]["name"]
+                sid2test[classlist[k]["id"]] = int(classlist[k]["paper_number"])
+
+            # Ask the server for the largest paper number we might see.
+            # Inferring this from len(sid2name) might work, but doing
+            # the extra work might make this robust against incorrect assumptions.
+            # TODO: later
+            # mm.IDgetClasslist()
+            infodict = mm.get_exam_info()
+            PaperUsed = [
+                False for _ in range(1, infodict["current_largest_paper_num"] + 1)
+            ]
+            print(f"*** PDLPATCH: List PaperUsed has length {len(PaperUsed)}.")
+
+        print("Applying `plom-hwscan` to pdfs...")
+        pdfs = sorted((upload_dir / "submittedHWByQ").glob("*.pdf"))
+        if not pdfs:
+            print(f"There was nothing in {upload_dir} for me to iterate over")
+        for pdf in tqdm(pdfs):
+            # get 12345678 from blah_blah.blah_blah.12345678._.
+            sid = pdf.stem.rsplit(".", 2)[-2]
+            try:
+                assert len(sid) == 8, "Student id has unexpected length, continuing"
+            except AssertionError as e:
+                errors.append((sid, e))
+                continue
 
-        if num_pages == num_questions:
-            # If number of pages precisely matches number of questions then
-            # do a 1-1 mapping...
-            q = [[x] for x in range(1, num_questions + 1)]
-        else:
-            # ... otherwise push each page to all questionsa.
-            q = [x for x in range(1, num_questions + 1)]
-        # TODO: capture output and put it all in a log file?  (capture_output=True?)
+            # try to open pdf first, continue on error
+            try:
+                with fitz.open(pdf) as doc:
+                    num_pages = doc.page_count
+            except RuntimeError as e:
+                print(f"Error processing student {sid} due to file error on {pdf}")
+                errors.append((sid, e))
+                continue
 
-        if True:  # "PDLPATCH" in os.environ:
-            print("*** Found what looks like a legit PDF, as follows ...")
-            print(f"    pdf:         {pdf}")
-            print(f"    sid:         {sid}")
-            print(f"    q:           {q}")
-
-            studentname = sid2name[sid]
-            print("*** PDLPATCH: Homebrew lookup suggests")
-            print(f"    studentname: {studentname}")
-
-            # Just-In-Time ID starts here.
-            mm = start_messenger(server, manager_pwd)
-
-            # Check if this SID is already associated with a test paper.
-            # Here we are our own notes, not the database.
-            # That's dubious.
-            testnumber = sid2test[sid]
-            if testnumber < 0:
-                # Expected case - new SID, no prename
-                testnumber = 1
-                while PaperUsed[testnumber]:
-                    testnumber += 1
-                print(f"*** PDLPATCH: First unused test is number {testnumber}.")
-                PaperUsed[testnumber] = True
-                print(f"*** PDLPATCH: Reserving test {testnumber} for {studentname}.")
-                sid2test[sid] = testnumber
-                mm.pre_id_paper(testnumber, sid)
+            if num_pages == num_questions:
+                # If number of pages precisely matches number of questions then
+                # do a 1-1 mapping...
+                q = [[x] for x in range(1, num_questions + 1)]
             else:
-                if not PaperUsed[testnumber]:
+                # ... otherwise push each page to all questionsa.
+                q = [x for x in range(1, num_questions + 1)]
+            # TODO: capture output and put it all in a log file?  (capture_output=True?)
+
+            if True:  # "PDLPATCH" in os.environ:
+                print("*** Found what looks like a legit PDF, as follows ...")
+                print(f"    pdf:         {pdf}")
+                print(f"    sid:         {sid}")
+                print(f"    q:           {q}")
+
+                studentname = sid2name[sid]
+                print("*** PDLPATCH: Homebrew lookup suggests")
+                print(f"    studentname: {studentname}")
+
+                # Just-In-Time ID starts here.
+                # Check if this SID is already associated with a test paper.
+                # Here we are our own notes, not the database.
+                # That's dubious.
+                testnumber = sid2test[sid]
+                if testnumber < 0:
+                    # Expected case - new SID, no prename
+                    testnumber = 1
+                    while PaperUsed[testnumber]:
+                        testnumber += 1
+                    print(f"*** PDLPATCH: First unused test is number {testnumber}.")
+                    PaperUsed[testnumber] = True
                     print(
-                        f"*** PDLPATCH: Classlist prescribes testnumber {testnumber}."
+                        f"*** PDLPATCH: Reserving test {testnumber} for {studentname}."
                     )
-                    PaperUsed[testnumber] = True
+                    sid2test[sid] = testnumber
                     mm.pre_id_paper(testnumber, sid)
                 else:
-                    print("*** PDLPATCH: EEK - not our first upload for this student.")
-                    print("    MANUAL INVESTIGATION REQUIRED")
-
-            mm.closeUser()
-            mm.stop()
-
-        # This broke until now
-        plom.scan.processHWScans(
-            pdf, sid, q, basedir=upload_dir, msgr=(server, scan_pwd)
-        )
-        # Now we can "lock-in" the IDing of it (optional, client can do later)
-        mm = start_messenger(server, manager_pwd)
-        try:
+                    if not PaperUsed[testnumber]:
+                        print(
+                            f"*** PDLPATCH: Classlist prescribes testnumber {testnumber}."
+                        )
+                        PaperUsed[testnumber] = True
+                        mm.pre_id_paper(testnumber, sid)
+                    else:
+                        print(
+                            "*** PDLPATCH: EEK - not our first upload for this student."
+                        )
+                        print("    MANUAL INVESTIGATION REQUIRED")
+
+            # This broke until now
+            plom.scan.processHWScans(
+                pdf, sid, q, basedir=upload_dir, msgr=(server, scan_pwd)
+            )
+            # Now we can "lock-in" the IDing of it (optional, client can do later)
             mm.id_paper(testnumber, sid, studentname)
-        finally:
-            mm.closeUser()
-            mm.stop()
-
-    else:
-        print(f"There was nothing in {upload_dir} for me to iterate over")
+    finally:
+        mm.closeUser()
+        mm.stop()
 
     for sid, err in errors:
         print(f"Error processing user_id {sid}: {str(err)}")
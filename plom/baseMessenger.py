@@ -6,12 +6,15 @@
 # Copyright (C) 2022-2023 Edith Coates
 # Copyright (C) 2023 Tam Nguyen
 
-from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import gzip
 import logging
 import os
 import threading
-from typing import Any, Dict, Tuple, Union
+from typing import Any, BinaryIO, Dict, List, Tuple, Union
 
+import orjson
 import requests
 from requests_toolbelt import MultipartDecoder
 import urllib3
@@ -48,6 +51,182 @@ log = logging.getLogger("messenger")
 # requests_log.propagate = True
 
 
+def _json(response: requests.Response) -> Any:
+    """Decode a JSON response, faster than ``response.json()`` on big payloads."""
+    return orjson.loads(response.content)
+
+
+def _encode_json(kwargs: Dict[str, Any]) -> None:
+    """Serialize the ``json`` argument of a request with orjson, in place.
+
+    Otherwise requests would use the slower stdlib json.  Anything orjson
+    cannot handle is left for requests to deal with as before.
+    """
+    if kwargs.get("json") is None or "data" in kwargs or "files" in kwargs:
+        return
+    try:
+        data = orjson.dumps(
+            kwargs["json"],
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    except orjson.JSONEncodeError:
+        return
+    del kwargs["json"]
+    kwargs["data"] = data
+    kwargs["headers"] = {
+        "Content-Type": "application/json",
+        **kwargs.get("headers", {}),
+    }
+
+
+# PUT/PATCH bodies at least this big are gzipped, see :func:`_gzip_body`
+_GZIP_MIN_SIZE = 1024
+
+
+def _gzip_body(kwargs: Dict[str, Any]) -> None:
+    """Compress the ``data`` argument of a request, in place, if it is big enough.
+
+    Only for servers that decompress request bodies: aiohttp (the legacy
+    server) does so by itself, Django does not.  Small bodies are not worth
+    the effort; streams and multipart encoders are left alone.
+    """
+    data = kwargs.get("data")
+    if not isinstance(data, bytes) or len(data) < _GZIP_MIN_SIZE:
+        return
+    kwargs["data"] = gzip.compress(data, compresslevel=5)
+    kwargs["headers"] = {"Content-Encoding": "gzip", **kwargs.get("headers", {})}
+
+
+def _stream_to(response: requests.Response, sink: BinaryIO) -> None:
+    """Copy the body of a ``stream=True`` response into a binary file-like object.
+
+    Goes chunk by chunk, so the whole body need never be in memory at once.
+    """
+    for chunk in response.iter_content(chunk_size=65536):
+        sink.write(chunk)
+
+
+def _error_detail(response: requests.Response) -> Any:
+    """The server's explanation of an error, for use in an exception.
+
+    Usually the body is JSON (a message or a dict of them) but don't fail
+    while failing if it's not: fall back to the text or the status reason.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.text or response.reason
+
+
+def _check(
+    response: requests.Response,
+    errors: Dict[int, Any],
+    unexpected: str = "Some other sort of error",
+) -> None:
+    """Raise the Plom exception for an error response, if any.
+
+    Args:
+        response: what the server said.
+        errors: HTTP status codes mapped to the exception to raise.
+            The exception gets the response's reason as its message,
+            unless given as a pair ``(exception, message)``.
+        unexpected: other error codes raise a ``PlomSeriousException``
+            with this message, followed by the error.
+
+    Raises:
+        As specified by ``errors``, or PlomSeriousException.
+    """
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        exc = errors.get(response.status_code)
+        if exc is None:
+            raise PlomSeriousException(f"{unexpected} {e}") from None
+        if isinstance(exc, tuple):
+            exc, msg = exc
+        else:
+            msg = response.reason
+        raise exc(msg) from None
+
+
+# How the server's error codes map onto our exceptions, per endpoint group
+_AUTH_ERRORS = {401: PlomAuthenticationException}
+_ADMIN_ERRORS = {401: PlomAuthenticationException, 403: PlomAuthenticationException}
+_SPEC_ERRORS = {400: PlomServerNotReady}
+_MAXMARK_ERRORS = {
+    401: PlomAuthenticationException,
+    400: PlomRangeException,
+    416: PlomRangeException,
+}
+_VERSION_MAP_ERRORS = {401: PlomAuthenticationException, 409: PlomServerNotReady}
+_CLASSLIST_ERRORS = {401: PlomAuthenticationException, 404: PlomNoClasslist}
+_GET_TAGS_ERRORS = {
+    401: PlomAuthenticationException,
+    404: PlomNoPaper,
+    406: PlomNoPaper,
+}
+_ADD_TAG_ERRORS = {
+    401: PlomAuthenticationException,
+    404: PlomBadTagError,
+    406: PlomBadTagError,
+    410: PlomBadTagError,
+}
+_REMOVE_TAG_ERRORS = {
+    401: PlomAuthenticationException,
+    404: PlomNoPaper,
+    409: PlomConflict,
+}
+_CREATE_TAG_ERRORS = {
+    401: PlomAuthenticationException,
+    406: PlomBadTagError,
+    409: PlomBadTagError,
+}
+_RUBRIC_ERRORS = {
+    401: PlomAuthenticationException,
+    400: PlomSeriousException,
+    406: PlomSeriousException,
+    409: PlomSeriousException,
+}
+_PAGEDATA_ERRORS = {401: PlomAuthenticationException, 409: PlomConflict}
+_IMAGE_ERRORS = {
+    401: PlomAuthenticationException,
+    404: (PlomNoMoreException, "Cannot find image"),
+    409: (PlomConflict, "Wrong md5sum provided"),
+}
+_ANNOTATIONS_ERRORS = {
+    400: PlomRangeException,
+    401: PlomAuthenticationException,
+    404: PlomNoPaper,
+    406: PlomTaskChangedError,
+    410: PlomTaskDeletedError,
+    416: PlomRangeException,
+}
+_SOLUTION_ERRORS = {
+    401: PlomAuthenticationException,
+    404: PlomNoSolutionException,
+}
+
+
+# Retry transient failures (dropped connections, a proxy that is briefly
+# unavailable) with a short backoff rather than surfacing them to the user.
+# Connect errors are retried for any method since nothing reached the
+# server.  Read errors and gateway statuses are only retried for GET/HEAD:
+# our PUT/PATCH/DELETE calls claim tasks, create rubrics and so on, and the
+# backend may have committed before the proxy gave up; also multipart
+# bodies cannot be rewound.  Leave the final status check to the caller's
+# ``raise_for_status``.
+_retry = urllib3.util.Retry(
+    total=3,
+    connect=2,
+    read=2,
+    status=2,
+    backoff_factor=0.3,
+    status_forcelist=frozenset((502, 503, 504)),
+    allowed_methods=frozenset(("GET", "HEAD")),
+    raise_on_status=False,
+)
+
+
 class BaseMessenger:
     """Basic communication with a Plom Server.
 
@@ -60,6 +239,11 @@ class BaseMessenger:
             ``"token"`` and value a string.
     """
 
+    # how many downloaded images to keep for reuse, see :meth:`get_image`,
+    # and how many bytes they may take up between them
+    image_cache_size = 64
+    image_cache_bytes = 256 * 1024 * 1024
+
     def __init__(
         self,
         server: Union[str, None] = None,
@@ -109,11 +293,13 @@ class BaseMessenger:
             # "localhost:1234" parses this way: we do it ourselves :(
             if scheme is None:
                 scheme = "https"
-            self._raw_init(f"{scheme}://{server}", verify_ssl=verify_ssl)
+            self._raw_init(f"{scheme}://{server}", scheme=scheme, verify_ssl=verify_ssl)
             return
 
         # prefix with "https://" if not specified
-        if not parsed_url.scheme:
+        if parsed_url.scheme:
+            scheme = parsed_url.scheme
+        else:
             if scheme is None:
                 scheme = "https"
             server = f"{scheme}://{server}"
@@ -124,20 +310,41 @@ class BaseMessenger:
                 port = Default_Port
             server = f"{server}:{port}"
 
-        self._raw_init(server, verify_ssl=verify_ssl)
+        self._raw_init(server, scheme=scheme, verify_ssl=verify_ssl)
 
-    def _raw_init(self, base: str, *, verify_ssl: Union[bool, str]) -> None:
+    def _raw_init(
+        self, base: str, *, scheme: str, verify_ssl: Union[bool, str]
+    ) -> None:
         self.session: Union[requests.Session, None] = None
+        # True if our session was borrowed from another messenger
+        self._borrowed_session = False
         self.user = None
         self.token = None
         self.default_timeout = (10, 60)
-        try:
-            parsed_url = urllib3.util.parse_url(base)
-        except urllib3.exceptions.LocationParseError as e:
-            raise PlomConnectionError(f'Cannot parse the URL "{base}"') from e
-        self.scheme = parsed_url.scheme
+        # Max marks and the version map of a paper do not change once set:
+        # remember them to save a roundtrip per question or per paper.
+        self._maxmark_cache: Dict[int, int] = {}
+        self._vmap_cache: Union[Dict[int, Dict[int, int]], None] = None
+        # what the server said at /Version when we started
+        self._server_version: Union[str, None] = None
+        # set this to stop the keepalive thread, if any
+        self._keepalive: Union[threading.Event, None] = None
+        # responses we can reuse, see :meth:`_if_none_match` and :meth:`get_image`
+        self._etag_cache: Dict[str, Tuple[str, bytes]] = {}
+        # GETs underway, so concurrent callers can share, see :meth:`_get_body`
+        self._inflight: Dict[str, Future] = {}
+        self._image_cache: OrderedDict[Tuple[Any, str], bytes] = OrderedDict()
+        self._image_cache_nbytes = 0
+        self._cache_lock = threading.Lock()
+        # our caller already parsed the URL, no need to do it again
+        self.scheme = scheme
         self.base = base
+        # Held only while sending a write, so they reach the server in the
+        # order we made them: checking and parsing replies happens outside.
         self.SRmutex = threading.Lock()
+        # Guards changes to our token and session settings; read-only
+        # requests need not hold SRmutex, they can share the pool freely.
+        self._auth_lock = threading.Lock()
         self.verify_ssl = verify_ssl
         if not self.verify_ssl:
             self._shutup_urllib3()
@@ -151,18 +358,28 @@ class BaseMessenger:
     def clone(cls, m):
         """Clone an existing messenger, keeps token.
 
-        In particular, we have our own mutex.
+        In particular, we have our own mutex.  If the original is started,
+        we share its session (and thus its pool of open connections) rather
+        than building a new one: stopping the clone won't close it.
         """
-        log.debug("cloning a messeger, but building new session...")
         x = cls(
             m.base,
             verify_ssl=m.verify_ssl,
             webplom=m.webplom,
         )
-        x.start()
+        if m.session:
+            log.debug("cloning a messenger, sharing its session")
+            x.session = m.session
+            x._borrowed_session = True
+            x._server_version = m._server_version
+        else:
+            log.debug("cloning a messenger, but building new session...")
+            x.start()
         log.debug("copying user/token into cloned messenger")
         x.user = m.user
         x.token = m.token
+        if not x._borrowed_session:
+            x._set_auth_header()
         return x
 
     def is_ssl_verified(self):
@@ -170,11 +387,27 @@ class BaseMessenger:
 
     def force_ssl_unverified(self):
         """This connection (can be open) does not need to verify cert SSL going forward."""
-        self.verify_ssl = False
-        if self.session:
-            self.session.verify = False
+        with self._auth_lock:
+            self.verify_ssl = False
+            if self.session:
+                self.session.verify = False
         self._shutup_urllib3()
 
+    def _set_auth_header(self) -> None:
+        """Put our token in (or remove it from) the session's headers.
+
+        Django-based servers expect the token in an ``Authorization``
+        header: we build it once here at login rather than on each call.
+        Legacy servers instead get the token in the json of each request.
+        """
+        if not self.session:
+            return
+        if self.webplom and self.token:
+            token_str = self.token["token"]
+            self.session.headers["Authorization"] = f"Token {token_str}"
+        else:
+            self.session.headers.pop("Authorization", None)
+
     def whoami(self):
         return self.user
 
@@ -201,96 +434,106 @@ class BaseMessenger:
     def server(self) -> str:
         return self.base
 
-    def get(self, url, *args, **kwargs):
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = self.default_timeout
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Perform an HTTP request on our session: all the verbs go through here.
 
-        # Legacy servers expect "user" and "token" in the json.
-        # Now with django we pass a token in the header.
-        # TODO: rework this when/if we stop supporting legacy servers.
-        if self.webplom and "json" in kwargs and "token" in kwargs["json"]:
-            if not self.token:
-                raise PlomAuthenticationException("Trying auth'd operation w/o token")
-            token_str = self.token["token"]
-            kwargs["headers"] = {"Authorization": f"Token {token_str}"}
-            json = kwargs["json"]
-            json.pop("token")
-            kwargs["json"] = json
+        Args:
+            method: e.g., "GET" or "PUT".
+            url: the path part of the URL, which we append to the server.
 
-        return self.session.get(self.base + url, *args, **kwargs)
+        Keyword Args:
+            timeout: if omitted, we use the messenger's default.
+            json: Legacy servers expect "user" and "token" in the json.
+                Now with django the token is in the session's headers,
+                see :meth:`_set_auth_header`, so we strip it from here.
+                TODO: rework this when/if we stop supporting legacy servers.
+            Others are passed to :meth:`requests.Session.request`.
 
-    def post_raw(self, url, *args, **kwargs):
-        """Perform a POST operation without tokens."""
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = self.default_timeout
-
-        return self.session.post(self.base + url, *args, **kwargs)
+        Returns:
+            The response from the server.
 
-    def post_auth(self, url, *args, **kwargs):
-        """Perform a POST operation with tokens for authentication."""
+        Raises:
+            PlomConnectionError: the messenger has not been started.
+        """
         if "timeout" not in kwargs:
             kwargs["timeout"] = self.default_timeout
+        if self.webplom and "json" in kwargs:
+            kwargs["json"].pop("token", None)
+        _encode_json(kwargs)
+        if method in ("PUT", "PATCH") and self.is_legacy_server():
+            _gzip_body(kwargs)
+        session = self.session
+        if session is None:
+            raise PlomConnectionError("messenger not started")
+        return session.request(method, self.base + url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self._request("GET", url, **kwargs)
+
+    def post_raw(self, url, **kwargs):
+        """Perform a POST operation without tokens."""
+        return self._request("POST", url, **kwargs)
 
-        if not self.token:
-            raise PlomAuthenticationException("Trying auth'd operation w/o token")
-
-        if self.webplom:
-            # Django-based servers pass token in the header
-            token_str = self.token["token"]
-            kwargs["headers"] = {"Authorization": f"Token {token_str}"}
-        else:
-            # Legacy servers expect "user" and "token" in the json.
-            json = kwargs.get("json", {})
-            json["user"] = self.user
-            json["token"] = self.token
-            kwargs["json"] = json
+    def put(self, url, **kwargs):
+        return self._request("PUT", url, **kwargs)
 
-        return self.session.post(self.base + url, *args, **kwargs)
+    def delete(self, url, **kwargs):
+        return self._request("DELETE", url, **kwargs)
 
-    def put(self, url, *args, **kwargs):
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = self.default_timeout
+    def patch(self, url, **kwargs):
+        return self._request("PATCH", url, **kwargs)
 
-        if self.webplom and "json" in kwargs and "token" in kwargs["json"]:
-            if not self.token:
-                raise PlomAuthenticationException("Trying auth'd operation w/o token")
-            token_str = self.token["token"]
-            kwargs["headers"] = {"Authorization": f"Token {token_str}"}
-            json = kwargs["json"]
-            json.pop("token")
-            kwargs["json"] = json
+    def _request_auth(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Perform an HTTP request with our token for authentication.
 
-        return self.session.put(self.base + url, *args, **kwargs)
+        Unlike :meth:`get` and friends, callers should not put "user" and
+        "token" in the json: we add them for legacy servers.  Django-based
+        servers get the token from the session's headers instead.
 
-    def delete(self, url, *args, **kwargs):
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = self.default_timeout
+        Raises:
+            PlomAuthenticationException: we are not logged in.
+            PlomConnectionError: the messenger has not been started.
+        """
+        # snapshot: another thread might log us out mid-request
+        token = self.token
+        if not token:
+            raise PlomAuthenticationException("Trying auth'd operation w/o token")
 
-        if self.webplom and "json" in kwargs and "token" in kwargs["json"]:
-            if not self.token:
-                raise PlomAuthenticationException("Trying auth'd operation w/o token")
-            token_str = self.token["token"]
-            kwargs["headers"] = {"Authorization": f"Token {token_str}"}
-            json = kwargs["json"]
-            json.pop("token")
+        if not self.webplom:
+            json = kwargs.get("json", {})
+            json["user"] = self.user
+            json["token"] = token
             kwargs["json"] = json
 
-        return self.session.delete(self.base + url, *args, **kwargs)
-
-    def patch(self, url, *args, **kwargs):
         if "timeout" not in kwargs:
             kwargs["timeout"] = self.default_timeout
+        _encode_json(kwargs)
+        if method in ("PUT", "PATCH") and self.is_legacy_server():
+            _gzip_body(kwargs)
+        session = self.session
+        if session is None:
+            raise PlomConnectionError("messenger not started")
+        return session.request(method, self.base + url, **kwargs)
+
+    def get_auth(self, url, **kwargs):
+        """Perform a GET operation with tokens for authentication."""
+        return self._request_auth("GET", url, **kwargs)
+
+    def post_auth(self, url, **kwargs):
+        """Perform a POST operation with tokens for authentication."""
+        return self._request_auth("POST", url, **kwargs)
 
-        if self.webplom and "json" in kwargs and "token" in kwargs["json"]:
-            if not self.token:
-                raise PlomAuthenticationException("Trying auth'd operation w/o token")
-            token_str = self.token["token"]
-            kwargs["headers"] = {"Authorization": f"Token {token_str}"}
-            json = kwargs["json"]
-            json.pop("token")
-            kwargs["json"] = json
+    def put_auth(self, url, **kwargs):
+        """Perform a PUT operation with tokens for authentication."""
+        return self._request_auth("PUT", url, **kwargs)
 
-        return self.session.patch(self.base + url, *args, **kwargs)
+    def delete_auth(self, url, **kwargs):
+        """Perform a DELETE operation with tokens for authentication."""
+        return self._request_auth("DELETE", url, **kwargs)
+
+    def patch_auth(self, url, **kwargs):
+        """Perform a PATCH operation with tokens for authentication."""
+        return self._request_auth("PATCH", url, **kwargs)
 
     def _start(self) -> str:
         """Start the messenger session, low-level.
@@ -304,17 +547,28 @@ class BaseMessenger:
             log.debug("starting a new requests-session")
             self.session = requests.Session()
             assert self.session
-            # TODO: not clear retries help: e.g., requests will not redo PUTs.
-            # More likely, just delays inevitable failures.
-            self.session.mount(
-                f"{self.scheme}://", requests.adapters.HTTPAdapter(max_retries=2)
+            # We only ever talk to one server, but maybe from many threads:
+            # keep enough connections alive that they don't get discarded.
+            # When all are busy, wait for one rather than opening (and then
+            # throwing away) another: bounds our sockets in long sessions.
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=16,
+                pool_block=True,
+                max_retries=_retry,
             )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
             self.session.verify = self.verify_ssl
+            # requests already asks for gzip and keep-alive on each Session;
+            # also tell the server who we are.
+            self.session.headers["User-Agent"] = f"plom-client/{__version__}"
 
         try:
             try:
                 response = self.get("/Version", timeout=2)
                 response.raise_for_status()
+                self._server_version = response.text
                 return response.text
             except requests.exceptions.SSLError as err:
                 if os.environ.get("PLOM_NO_SSL_VERIFY"):
@@ -328,6 +582,7 @@ class BaseMessenger:
                 self.force_ssl_unverified()
                 response = self.get("/Version", timeout=2)
                 response.raise_for_status()
+                self._server_version = response.text
                 return response.text
         except requests.ConnectionError as err:
             raise PlomConnectionError(err) from None
@@ -351,12 +606,153 @@ class BaseMessenger:
             self.disable_legacy_server_support()
         return s
 
+    def flush_cache(self, prefix: Union[str, None] = None) -> None:
+        """Forget responses we've kept for reuse.
+
+        Args:
+            prefix: forget only the JSON responses of URLs starting with
+                this, e.g., ``"/MK/rubric"``.  If omitted, forget all of
+                them and the images too.
+
+        GETs of those URLs already underway are not waited for by later
+        callers: after a write, the next read always asks the server.
+        """
+        with self._cache_lock:
+            if prefix is None:
+                self._etag_cache.clear()
+                self._image_cache.clear()
+                self._image_cache_nbytes = 0
+                self._inflight.clear()
+                return
+            for url in [u for u in self._etag_cache if u.startswith(prefix)]:
+                del self._etag_cache[url]
+            # A GET underway may have been sent before whatever made the
+            # caller flush: later callers must not join it, see _get_body.
+            for url in [u for u in self._inflight if u.startswith(prefix)]:
+                del self._inflight[url]
+
+    def _if_none_match(self, url: str) -> Dict[str, str]:
+        """Headers asking the server to skip the body if our copy is current.
+
+        Use with :meth:`_content_or_cached` to make a revalidating GET.
+        """
+        cached = self._etag_cache.get(url)
+        if not cached:
+            return {}
+        return {"If-None-Match": cached[0]}
+
+    def _content_or_cached(self, url: str, response: requests.Response) -> bytes:
+        """The body of a successful response, or our copy if it was "304 Not Modified".
+
+        If the server sends an ``ETag``, we keep the body so that next time
+        (see :meth:`_if_none_match`) the server can answer with just a 304.
+        Servers that don't send ETags just get plain GETs.
+        """
+        cached = self._etag_cache.get(url)
+        if response.status_code == 304:
+            if cached:
+                return cached[1]
+            # we got flushed mid-request: ask again, no questions this time
+            response = self.get_auth(url)
+            response.raise_for_status()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self._etag_cache[url] = (etag, response.content)
+        return response.content
+
+    def _get_body(
+        self,
+        url: str,
+        errors: Dict[int, Any],
+        unexpected: str = "Some other sort of error",
+        *,
+        revalidate: bool = False,
+    ) -> bytes:
+        """GET the body of a URL, sharing one request among concurrent callers.
+
+        If another thread is already fetching the same URL, we wait for its
+        answer (or its exception) rather than asking the server again.  Only
+        for read-only GETs: callers get the same bytes, and decode their own
+        copy of any JSON.
+
+        Args:
+            url: the path part of the URL.
+            errors: as in :func:`_check`.
+            unexpected: as in :func:`_check`.
+
+        Keyword Args:
+            revalidate: keep the body and its ETag, see :meth:`_if_none_match`.
+        """
+        with self._cache_lock:
+            pending = self._inflight.get(url)
+            if pending is None:
+                fut: Future = Future()
+                self._inflight[url] = fut
+        if pending is not None:
+            return pending.result()
+        try:
+            headers = self._if_none_match(url) if revalidate else {}
+            response = self.get_auth(url, headers=headers)
+            _check(response, errors, unexpected)
+            if revalidate:
+                body = self._content_or_cached(url, response)
+            else:
+                body = response.content
+            fut.set_result(body)
+            return body
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._cache_lock:
+                # unless flush_cache() already detached us
+                if self._inflight.get(url) is fut:
+                    del self._inflight[url]
+
+    def start_keepalive(self, interval: float = 30) -> None:
+        """Ping the server now and then, so our connections don't go stale.
+
+        A GUI client can sit idle for minutes, by which time the server
+        may have closed our kept-alive connection: the next real request
+        would then pay for a new handshake.  This starts a background
+        thread that sends a cheap ``HEAD /Version`` every so often, until
+        :meth:`stop` is called.  Does nothing if already running.
+
+        Keyword Args:
+            interval: seconds between pings.
+        """
+        if self._keepalive is not None:
+            return
+        stopped = threading.Event()
+
+        def ping():
+            while not stopped.wait(interval):
+                session = self.session
+                if not session:
+                    return
+                try:
+                    session.head(self.base + "/Version", timeout=2)
+                except requests.RequestException as e:
+                    log.debug("keepalive ping failed: %s", e)
+
+        self._keepalive = stopped
+        threading.Thread(target=ping, name="msgr-keepalive", daemon=True).start()
+
     def stop(self) -> None:
         """Stop the messenger."""
+        if self._keepalive is not None:
+            self._keepalive.set()
+            self._keepalive = None
         if self.session:
-            log.debug("stopping requests-session")
-            self.session.close()
+            if self._borrowed_session:
+                log.debug("dropping borrowed requests-session")
+            else:
+                log.debug("stopping requests-session")
+                self.session.close()
             self.session = None
+            self._borrowed_session = False
+        self._server_version = None
 
     def isStarted(self):
         return bool(self.session)
@@ -365,17 +761,19 @@ class BaseMessenger:
         """The version info of the server.
 
         Returns:
-            The version string of the server,
+            The version string of the server.  If we've been started, this
+            is what the server told us then: we don't ask again.
 
         Exceptions:
         """
-        with self.SRmutex:
-            try:
-                response = self.get("/Version")
-                response.raise_for_status()
-                return response.text
-            except requests.HTTPError as e:
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        if self._server_version is not None:
+            return self._server_version
+        try:
+            response = self.get("/Version")
+            response.raise_for_status()
+            return response.text
+        except requests.HTTPError as e:
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def get_server_info(self) -> Dict[str, Any]:
         """Get a dictionary of server software information.
@@ -387,13 +785,12 @@ class BaseMessenger:
             TODO: maybe older servers don't have this API; they would
                 respond with 404.
         """
-        with self.SRmutex:
-            try:
-                response = self.get("/info/server")
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get("/info/server")
+            response.raise_for_status()
+            return _json(response)
+        except requests.HTTPError as e:
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     # ------------------------
     # ------------------------
@@ -419,80 +816,70 @@ class BaseMessenger:
             self._requestAndSaveToken(user, pw)
 
     def _requestAndSaveToken(self, user, pw):
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                f"/users/{user}",
+        with self._auth_lock:
+            try:
+                response = self.put(
+                    f"/users/{user}",
+                    json={
+                        "user": user,
+                        "pw": pw,
+                        "api": Plom_Legacy_Server_API_Version,
+                        "client_ver": __version__,
+                    },
+                    timeout=5,
+                )
+                # throw errors when response code != 200.
+                response.raise_for_status()
+                self.token = _json(response)
+                self.user = user
+            except requests.HTTPError as e:
+                if response.status_code == 401:
+                    raise PlomAuthenticationException(_error_detail(response)) from None
+                elif response.status_code == 400:
+                    raise PlomAPIException(_error_detail(response)) from None
+                elif response.status_code == 409:
+                    raise PlomExistingLoginException(_error_detail(response)) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            except requests.ConnectionError as err:
+                raise PlomSeriousException(
+                    f"Cannot connect to server {self.base}\n{err}\n\nPlease check details and try again."
+                ) from None
+
+    def _requestAndSaveToken_webplom(self, user, pw):
+        """Get an authorisation token from WebPlom."""
+        with self._auth_lock:
+            response = self.post_raw(
+                "/get_token/",
                 json={
-                    "user": user,
-                    "pw": pw,
-                    "api": Plom_Legacy_Server_API_Version,
-                    "client_ver": __version__,
+                    "username": user,
+                    "password": pw,
                 },
                 timeout=5,
             )
-            # throw errors when response code != 200.
-            response.raise_for_status()
-            self.token = response.json()
-            self.user = user
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException(response.json()) from None
-            elif response.status_code == 400:
-                raise PlomAPIException(response.json()) from None
-            elif response.status_code == 409:
-                raise PlomExistingLoginException(response.json()) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        except requests.ConnectionError as err:
-            raise PlomSeriousException(
-                f"Cannot connect to server {self.base}\n{err}\n\nPlease check details and try again."
-            ) from None
-        finally:
-            self.SRmutex.release()
-
-    def _requestAndSaveToken_webplom(self, user, pw):
-        """Get an authorisation token from WebPlom."""
-        self.SRmutex.acquire()
-        response = self.post_raw(
-            "/get_token/",
-            json={
-                "username": user,
-                "password": pw,
-            },
-            timeout=5,
-        )
-        try:
-            response.raise_for_status()
-            self.token = response.json()
-            self.user = user
-        except requests.HTTPError as e:
-            if response.status_code == 400:
-                raise PlomAuthenticationException(response.json()) from None
-            elif response.status_code == 401:
-                raise PlomAPIException(response.json()) from None
-            elif response.status_code == 409:
-                raise PlomExistingLoginException(response.json()) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        except requests.ConnectionError as err:
-            raise PlomSeriousException(
-                f"Cannot connect to server {self.base}\n{err}\n\nPlease check details and try again."
-            ) from None
-        finally:
-            self.SRmutex.release()
+            try:
+                response.raise_for_status()
+                self.token = _json(response)
+                self.user = user
+                self._set_auth_header()
+            except requests.HTTPError as e:
+                if response.status_code == 400:
+                    raise PlomAuthenticationException(_error_detail(response)) from None
+                elif response.status_code == 401:
+                    raise PlomAPIException(_error_detail(response)) from None
+                elif response.status_code == 409:
+                    raise PlomExistingLoginException(_error_detail(response)) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            except requests.ConnectionError as err:
+                raise PlomSeriousException(
+                    f"Cannot connect to server {self.base}\n{err}\n\nPlease check details and try again."
+                ) from None
 
     def clearAuthorisation(self, user, pw):
-        self.SRmutex.acquire()
-        try:
+        with self._auth_lock:
             response = self.delete(
                 "/authorisation", json={"user": user, "password": pw}
             )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+            _check(response, _AUTH_ERRORS)
 
     def closeUser(self):
         """User self-indicates they are logging out, surrender token and tasks.
@@ -507,18 +894,14 @@ class BaseMessenger:
             path = "/close_user/"
         else:
             path = f"/users/{self.user}"
-        with self.SRmutex:
-            try:
-                response = self.delete(
-                    path,
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        with self._auth_lock:
+            response = self.delete_auth(path)
+            _check(response, _AUTH_ERRORS)
             self.token = None
+            self._set_auth_header()
+            self._maxmark_cache = {}
+            self._vmap_cache = None
+            self.flush_cache()
 
     # ----------------------
     # ----------------------
@@ -531,16 +914,12 @@ class BaseMessenger:
             Key-value pairs of information about this particular
             assessment.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/info/exam",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get_auth("/info/exam")
+            response.raise_for_status()
+            return _json(response)
+        except requests.HTTPError as e:
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def get_spec(self):
         """Get the specification of the exam from the server.
@@ -551,41 +930,31 @@ class BaseMessenger:
         Exceptions:
             PlomServerNotReady: server does not yet have a spec.
         """
-        with self.SRmutex:
-            try:
-                response = self.get("/info/spec")
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 400:
-                    raise PlomServerNotReady(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get("/info/spec")
+        _check(response, _SPEC_ERRORS)
+        return _json(response)
 
     def getMaxMark(self, question):
         """Get the maximum mark for this question.
 
+        The answer is remembered: later calls for the same question do
+        not contact the server.
+
         Raises:
             PlomRangeException: `question` is out of range or non-integer.
             PlomAuthenticationException:
             PlomSeriousException: something unexpected happened.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/maxmark/{question}",
-                    json={"user": self.user, "token": self.token},
-                )
-                # throw errors when response code != 200.
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 400:
-                    raise PlomRangeException(response.reason) from None
-                if response.status_code == 416:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            return self._maxmark_cache[int(question)]
+        except (KeyError, ValueError):
+            pass
+        response = self.get_auth(f"/maxmark/{question}")
+        _check(response, _MAXMARK_ERRORS)
+        maxmark = _json(response)
+        # a valid question is an integer, else the server would've complained
+        self._maxmark_cache[int(question)] = maxmark
+        return maxmark
 
     def getQuestionVersionMap(self, papernum):
         """Get the question-version map for one paper.
@@ -596,25 +965,27 @@ class BaseMessenger:
             keys b/c of JSON (transport) limitations but this function
             converts them for us.
 
+        The first call fetches the version map of all papers: later calls
+        are answered from that rather than asking the server each time.
+        Papers missing from it (perhaps built later) are fetched singly.
+
         Raises:
             PlomServerNotReady: server does not yet have a version map,
                 e.g., b/c it has not been built, or server has no spec.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/plom/admin/questionVersionMap/{papernum}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                elif response.status_code == 409:
-                    raise PlomServerNotReady(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        if self._vmap_cache is None:
+            # populates the cache as a side effect
+            self.getGlobalQuestionVersionMap()
+        qvmap = self._vmap_cache.get(int(papernum))
+        if qvmap:
+            return dict(qvmap)
+        response = self.get_auth(f"/plom/admin/questionVersionMap/{papernum}")
+        _check(response, _VERSION_MAP_ERRORS)
         # JSON casts dict keys to str, force back to ints
-        return {int(q): v for q, v in response.json().items()}
+        r = _json(response)
+        qvmap = dict(zip(map(int, r), r.values()))
+        self._vmap_cache[int(papernum)] = qvmap
+        return dict(qvmap)
 
     def getGlobalQuestionVersionMap(self):
         """Get the question-version map for all papers.
@@ -630,19 +1001,13 @@ class BaseMessenger:
         Raises:
             PlomAuthenticationException: login troubles.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/questionVersionMap",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/plom/admin/questionVersionMap")
+        _check(response, _AUTH_ERRORS)
         # JSON casts dict keys to str, force back to ints
-        return undo_json_packing_of_version_map(response.json())
+        vmap = undo_json_packing_of_version_map(_json(response))
+        # refresh our snapshot, used by :meth:`getQuestionVersionMap`
+        self._vmap_cache = {p: dict(row) for p, row in vmap.items()}
+        return vmap
 
     def IDrequestClasslist(self):
         """Ask server for the classlist.
@@ -657,29 +1022,15 @@ class BaseMessenger:
             PlomNoClasslist: server has no classlist.
             PlomSeriousException: any other unexpected failures.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                "/ID/classlist",
-                json={"user": self.user, "token": self.token},
-            )
-            # throw errors when response code != 200.
-            response.raise_for_status()
-            # you can assign to the encoding to override the autodetection
-            # TODO: define API such that classlist must be utf-8?
-            # print(response.encoding)
-            # response.encoding = 'utf-8'
-            # classlist = StringIO(response.text)
-            classlist = response.json()
-            return classlist
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 404:
-                raise PlomNoClasslist(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        response = self.get_auth("/ID/classlist")
+        _check(response, _CLASSLIST_ERRORS)
+        # you can assign to the encoding to override the autodetection
+        # TODO: define API such that classlist must be utf-8?
+        # print(response.encoding)
+        # response.encoding = 'utf-8'
+        # classlist = StringIO(response.text)
+        classlist = _json(response)
+        return classlist
 
     def IDgetPredictions(self):
         """Get all the predicted student ids.
@@ -692,19 +1043,10 @@ class BaseMessenger:
             dict: keys are str of papernum, values themselves are lists of dicts with
             keys `"student_id"`, `"certainty"`, and `"predictor"`.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/ID/predictions",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                # returns a json of dict of test:(sid, sname, certainty)
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/ID/predictions")
+        _check(response, _AUTH_ERRORS)
+        # returns a json of dict of test:(sid, sname, certainty)
+        return _json(response)
 
     def IDgetPredictionsFromPredictor(self, predictor):
         """Get all the predicted student ids, generated by a particular predictor.
@@ -719,18 +1061,9 @@ class BaseMessenger:
             dict: keys are str of papernum, values themselves dicts with
             keys `"student_id"`, `"certainty"`, and `"predictor"`.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/ID/predictions/{predictor}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth(f"/ID/predictions/{predictor}")
+        _check(response, _AUTH_ERRORS)
+        return _json(response)
 
     def sid_to_paper_number(self, student_id) -> Tuple[bool, Union[int, str], str]:
         """Ask server to match given student_id to a test-number.
@@ -759,30 +1092,22 @@ class BaseMessenger:
         Raises:
             PlomAuthenticationException: wrong user, wrong token etc.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/sidToTest",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "sid": student_id,
-                    },
-                )
-                response.raise_for_status()
-                r = response.json()
-                # TODO: could remove workaround when we stop supported 0.14.1
-                if len(r) <= 2:
-                    if r[0]:
-                        r.append("[Older server; cannot tell if ided or prenamed]")
-                    else:
-                        r.append("")
-                r = tuple(r)
-                return r
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth(
+            "/plom/admin/sidToTest",
+            json={
+                "sid": student_id,
+            },
+        )
+        _check(response, _AUTH_ERRORS)
+        r = _json(response)
+        # TODO: could remove workaround when we stop supported 0.14.1
+        if len(r) <= 2:
+            if r[0]:
+                r.append("[Older server; cannot tell if ided or prenamed]")
+            else:
+                r.append("")
+        r = tuple(r)
+        return r
 
     def get_all_tags(self):
         """All the tags currently in use and their frequencies.
@@ -790,18 +1115,9 @@ class BaseMessenger:
         Returns:
             dict: keys are tags and values are usage counts.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/tags",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/tags")
+        _check(response, _AUTH_ERRORS)
+        return _json(response)
 
     def get_tags(self, code):
         """Get a list of tags associated with a paper and question.
@@ -821,20 +1137,24 @@ class BaseMessenger:
             PlomNoPaper: the task was not found (or was poorly formed
                 in the request).
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/tags/{code}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code in (404, 406):
-                    raise PlomNoPaper(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth(f"/tags/{code}")
+        _check(response, _GET_TAGS_ERRORS)
+        return _json(response)
+
+    def get_tags_many(self, codes: List[str]) -> Dict[str, Any]:
+        """Get the tags of many tasks at once, see :meth:`get_tags`.
+
+        Neither server has a batch endpoint for this, so we issue the
+        requests concurrently rather than one after another.
+
+        Args:
+            codes: a list of task codes, such as ``"q0009g3"``.
+
+        Returns:
+            Keyed by each of the codes, values are what :meth:`get_tags`
+            would give.
+        """
+        return dict(zip(codes, self._fan_out(self.get_tags, [(c,) for c in codes])))
 
     def add_single_tag(self, code: str, tag_text: str) -> None:
         """Add a tag to a task.
@@ -852,18 +1172,11 @@ class BaseMessenger:
                 Also no such task, or invalid formed task code.
         """
         with self.SRmutex:
-            try:
-                response = self.patch(
-                    f"/tags/{code}",
-                    json={"user": self.user, "token": self.token, "tag_text": tag_text},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code in (406, 404, 410):
-                    raise PlomBadTagError(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response = self.patch_auth(
+                f"/tags/{code}",
+                json={"tag_text": tag_text},
+            )
+        _check(response, _ADD_TAG_ERRORS)
 
     def remove_single_tag(self, task, tag_text):
         """Remove a tag from a task.
@@ -880,42 +1193,22 @@ class BaseMessenger:
             PlomConflict: no such task
         """
         with self.SRmutex:
-            try:
-                response = self.delete(
-                    f"/tags/{task}",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "tag_text": tag_text,
-                    },
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 409:
-                    raise PlomConflict(response.reason) from None
-                if response.status_code == 404:
-                    raise PlomNoPaper(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response = self.delete_auth(
+                f"/tags/{task}",
+                json={
+                    "tag_text": tag_text,
+                },
+            )
+        _check(response, _REMOVE_TAG_ERRORS)
 
     def create_new_tag(self, tag_text):
-        self.SRmutex.acquire()
-        try:
-            response = self.patch(
+        with self.SRmutex:
+            response = self.patch_auth(
                 "/tags",
-                json={"user": self.user, "token": self.token, "tag_text": tag_text},
+                json={"tag_text": tag_text},
             )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            if response.status_code in [406, 409]:
-                raise PlomBadTagError(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        _check(response, _CREATE_TAG_ERRORS)
+        return _json(response)
 
     def McreateRubric(self, new_rubric):
         """Ask server to make a new rubric and get key back.
@@ -930,27 +1223,17 @@ class BaseMessenger:
         Returns:
             str: the key/id of the new rubric.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
+        with self.SRmutex:
+            response = self.put_auth(
                 "/MK/rubric",
                 json={
-                    "user": self.user,
-                    "token": self.token,
                     "rubric": new_rubric,
                 },
             )
-            response.raise_for_status()
-            new_key = response.json()
-            return new_key
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 406:
-                raise PlomSeriousException(response.reason) from None
-            raise PlomSeriousException(f"Error when creating new rubric: {e}") from None
-        finally:
-            self.SRmutex.release()
+        _check(response, _RUBRIC_ERRORS, "Error when creating new rubric:")
+        new_key = _json(response)
+        self.flush_cache("/MK/rubric")
+        return new_key
 
     def MgetRubrics(self):
         """Retrieve list of all rubrics from server.
@@ -963,23 +1246,10 @@ class BaseMessenger:
             list: list of dicts, possibly an empty list if server has no
                 rubrics.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                "/MK/rubric",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException(response.reason) from None
-            raise PlomSeriousException(f"Error getting rubric list: {e}") from None
-        finally:
-            self.SRmutex.release()
+        body = self._get_body(
+            "/MK/rubric", _AUTH_ERRORS, "Error getting rubric list:", revalidate=True
+        )
+        return orjson.loads(body)
 
     def MgetRubricsByQuestion(self, question):
         """Retrieve list of all rubrics from server for given question.
@@ -995,23 +1265,13 @@ class BaseMessenger:
             list: list of dicts, possibly an empty list if server has no
                 rubrics for this question.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                f"/MK/rubric/{question}",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Error getting rubric list: {e}") from None
-        finally:
-            self.SRmutex.release()
+        body = self._get_body(
+            f"/MK/rubric/{question}",
+            _AUTH_ERRORS,
+            "Error getting rubric list:",
+            revalidate=True,
+        )
+        return orjson.loads(body)
 
     def MmodifyRubric(self, key, new_rubric):
         """Ask server to modify a rubric and get key back.
@@ -1027,72 +1287,47 @@ class BaseMessenger:
             str: the key/id of the rubric.  Currently should be unchanged
             from what you sent.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.patch(
+        with self.SRmutex:
+            response = self.patch_auth(
                 f"/MK/rubric/{key}",
                 json={
-                    "user": self.user,
-                    "token": self.token,
                     "rubric": new_rubric,
                 },
             )
-            response.raise_for_status()
-            new_key = response.json()
-            return new_key
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException(response.reason) from None
-            elif response.status_code == 400:
-                raise PlomSeriousException(response.reason) from None
-            elif response.status_code == 406:
-                raise PlomSeriousException(response.reason) from None
-            elif response.status_code == 409:
-                raise PlomSeriousException(response.reason) from None
-            raise PlomSeriousException(
-                f"Error of type {e} when creating new rubric"
-            ) from None
-        finally:
-            self.SRmutex.release()
+        _check(response, _RUBRIC_ERRORS, "Error when modifying rubric:")
+        new_key = _json(response)
+        self.flush_cache("/MK/rubric")
+        return new_key
 
     def get_pagedata(self, code):
         """Get metadata about the images in this paper."""
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/pagedata/{code}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 409:
-                    raise PlomConflict(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        return orjson.loads(self._get_body(f"/pagedata/{code}", _PAGEDATA_ERRORS))
+
+    def get_pagedata_many(self, codes: List[Union[int, str]]) -> Dict[Any, Any]:
+        """Get metadata about the images in many papers at once.
+
+        See :meth:`get_pagedata`: the requests are issued concurrently.
+
+        Args:
+            codes: a list of paper numbers.
+
+        Returns:
+            Keyed by each of the codes, values are what :meth:`get_pagedata`
+            would give.
+        """
+        return dict(zip(codes, self._fan_out(self.get_pagedata, [(c,) for c in codes])))
 
     def get_pagedata_context_question(self, code, questionNumber):
         """Get metadata about all non-ID page images in this paper, as related to a question.
 
         For now, questionNumber effects the "included" column...
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    f"/pagedata/{code}/context/{questionNumber}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 409:
-                    raise PlomConflict(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        url = f"/pagedata/{code}/context/{questionNumber}"
+        return orjson.loads(self._get_body(url, _PAGEDATA_ERRORS))
 
-    def get_image(self, image_id, md5sum):
+    def get_image(
+        self, image_id, md5sum, *, sink: Union[BinaryIO, None] = None
+    ) -> Union[bytes, None]:
         """Download one image from server by its database id.
 
         Args:
@@ -1101,32 +1336,50 @@ class BaseMessenger:
             md5sum (str): the expected md5sum, just for sanity checks or
                 something I suppose.
 
+        Keyword Args:
+            sink: an open binary file (or similar) to write the image into,
+                rather than returning it.  The download is streamed so the
+                image need not be held in memory.
+
         Returns:
-            bytes: png/jpeg or whatever as bytes.
+            bytes: png/jpeg or whatever as bytes, or None if you gave a
+            ``sink``.  The last few are kept: an image's md5sum pins its
+            content, so we can reuse them without asking the server again.
+            See :attr:`image_cache_size` and :attr:`image_cache_bytes`.
 
         Errors/Exceptions:
             401: not authenticated
             404: no such image
             409: wrong md5sum provided
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                f"/MK/images/{image_id}/{md5sum}",
-                json={"user": self.user, "token": self.token},
-            )
-            response.raise_for_status()
-            image = BytesIO(response.content).getvalue()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            if response.status_code == 409:
-                raise PlomConflict("Wrong md5sum provided") from None
-            if response.status_code == 404:
-                raise PlomNoMoreException("Cannot find image") from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        key = (image_id, md5sum)
+        with self._cache_lock:
+            image = self._image_cache.get(key)
+            if image is not None:
+                self._image_cache.move_to_end(key)
+        url = f"/MK/images/{image_id}/{md5sum}"
+        if image is None and sink is not None:
+            with self.get_auth(url, stream=True) as response:
+                _check(response, _IMAGE_ERRORS)
+                _stream_to(response, sink)
+            return None
+        if image is None:
+            image = self._get_body(url, _IMAGE_ERRORS)
+            with self._cache_lock:
+                old = self._image_cache.pop(key, None)
+                if old is not None:
+                    self._image_cache_nbytes -= len(old)
+                self._image_cache[key] = image
+                self._image_cache_nbytes += len(image)
+                while len(self._image_cache) > 1 and (
+                    len(self._image_cache) > self.image_cache_size
+                    or self._image_cache_nbytes > self.image_cache_bytes
+                ):
+                    _, old = self._image_cache.popitem(last=False)
+                    self._image_cache_nbytes -= len(old)
+        if sink is not None:
+            sink.write(image)
+            return None
         return image
 
     def get_annotations(self, num, question, edition=None, integrity=None):
@@ -1155,32 +1408,14 @@ class BaseMessenger:
             url = f"/annotations/{num}/{question}/{edition}"
         if integrity is None:
             integrity = ""
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    url,
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "integrity": integrity,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 400:
-                    raise PlomRangeException(response.reason) from None
-                elif response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                elif response.status_code == 404:
-                    raise PlomNoPaper(response.reason) from None
-                elif response.status_code == 406:
-                    raise PlomTaskChangedError(response.reason) from None
-                elif response.status_code == 410:
-                    raise PlomTaskDeletedError(response.reason) from None
-                elif response.status_code == 416:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth(
+            url,
+            json={
+                "integrity": integrity,
+            },
+        )
+        _check(response, _ANNOTATIONS_ERRORS)
+        return _json(response)
 
     def get_annotations_image(self, num, question, edition=None) -> Tuple[Dict, bytes]:
         """Download image of the latest annotations (or a particular set of annotations).
@@ -1207,130 +1442,115 @@ class BaseMessenger:
             url = f"/annotations_image/{num}/{question}"
         else:
             url = f"/annotations_image/{num}/{question}/{edition}"
-        with self.SRmutex:
-            try:
-                response = self.get(url, json={"user": self.user, "token": self.token})
-                response.raise_for_status()
-                info: Dict[str, Any] = {}
-                info["Content-Type"] = response.headers.get("Content-Type", None)
-                if info["Content-Type"] == "image/png":
-                    info["extension"] = "png"
-                elif info["Content-Type"] == "image/jpeg":
-                    info["extension"] = "jpg"
-                else:
-                    raise PlomSeriousException(
-                        "Failed to identify extension of image data for previous annotations"
-                    )
-                return info, BytesIO(response.content).getvalue()
-            except requests.HTTPError as e:
-                if response.status_code == 400:
-                    raise PlomRangeException(response.reason) from None
-                elif response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                elif response.status_code == 404:
-                    raise PlomNoPaper(response.reason) from None
-                elif response.status_code == 406:
-                    raise PlomTaskChangedError(response.reason) from None
-                elif response.status_code == 410:
-                    raise PlomTaskDeletedError(response.reason) from None
-                elif response.status_code == 416:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth(url)
+        _check(response, _ANNOTATIONS_ERRORS)
+        info: Dict[str, Any] = {}
+        info["Content-Type"] = response.headers.get("Content-Type", None)
+        if info["Content-Type"] == "image/png":
+            info["extension"] = "png"
+        elif info["Content-Type"] == "image/jpeg":
+            info["extension"] = "jpg"
+        else:
+            raise PlomSeriousException(
+                "Failed to identify extension of image data for previous annotations"
+            )
+        return info, response.content
+
+    def _fan_out(self, fn, arglist, *, max_workers: int = 8) -> List[Any]:
+        """Call ``fn(*args)`` for each ``args`` in the list, several at once.
+
+        The read-only requests don't hold the mutex and share a pool of
+        connections, so a few threads can overlap N round-trips rather than
+        paying for them one after another.
+
+        Returns:
+            The results, in the same order as ``arglist``.  If any call
+            raises, the first such exception (in order) is re-raised.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda args: fn(*args), arglist))
+
+    def get_images_bulk(self, images: List[Tuple[int, str]]) -> List[bytes]:
+        """Download many images at once, see :meth:`get_image`.
+
+        Args:
+            images: a list of pairs ``(image_id, md5sum)``.
+
+        Returns:
+            The bytes of each image, in the same order as ``images``.
+        """
+        return self._fan_out(self.get_image, images)
+
+    def get_annotations_images_bulk(
+        self, tasks: List[Tuple[int, int]]
+    ) -> List[Tuple[Dict, bytes]]:
+        """Download the latest annotation images of many tasks at once.
+
+        See :meth:`get_annotations_image`.
+
+        Args:
+            tasks: a list of pairs ``(paper_number, question)``.
+
+        Returns:
+            The info and bytes of each image, in the same order as ``tasks``.
+        """
+        return self._fan_out(self.get_annotations_image, tasks)
 
     def getSolutionStatus(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/REP/solutions",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/REP/solutions")
+        _check(response, _AUTH_ERRORS)
+        return _json(response)
 
-    def getSolutionImage(self, question: int, version: int) -> bytes:
+    def getSolutionImage(
+        self, question: int, version: int, *, sink: Union[BinaryIO, None] = None
+    ) -> Union[bytes, None]:
         """Download the solution image for a question version.
 
         Args:
             question: the question number.
             version: the version number.
 
+        Keyword Args:
+            sink: an open binary file (or similar) to write the image into,
+                rather than returning it.  The download is streamed.
+
         Returns:
-            contents of a bitmap file.
+            contents of a bitmap file, or None if you gave a ``sink``.
 
         Raises:
             PlomAuthenticationException
             PlomNoSolutionException
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/MK/solution",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "question": question,
-                        "version": version,
-                    },
+        with self.get_auth(
+            "/MK/solution",
+            json={
+                "question": question,
+                "version": version,
+            },
+            stream=sink is not None,
+        ) as response:
+            _check(response, _SOLUTION_ERRORS)
+            # deprecated: new servers will 404
+            if response.status_code == 204:
+                raise PlomNoSolutionException(
+                    f"Server has no solution for question {question} version {version}",
                 )
-                response.raise_for_status()
-                # deprecated: new servers will 404
-                if response.status_code == 204:
-                    raise PlomNoSolutionException(
-                        f"Server has no solution for question {question} version {version}",
-                    ) from None
-                return BytesIO(response.content).getvalue()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 404:
-                    raise PlomNoSolutionException(response.reason)
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            if sink is None:
+                return response.content
+            _stream_to(response, sink)
+            return None
 
     def getUnknownPages(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/unknownPages",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/plom/admin/unknownPages")
+        _check(response, _ADMIN_ERRORS)
+        return _json(response)
 
     def getDiscardedPages(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/discardedPages",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/plom/admin/discardedPages")
+        _check(response, _ADMIN_ERRORS)
+        return _json(response)
 
     def getCollidingPageNames(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/collidingPageNames",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get_auth("/plom/admin/collidingPageNames")
+        _check(response, _AUTH_ERRORS)
+        return _json(response)
@@ -4,6 +4,7 @@
 # Copyright (C) 2023 Laurent MacKay
 """Misc utils for interacting with Canvas."""
 
+from concurrent.futures import ThreadPoolExecutor
 import csv
 from pathlib import Path
 import random
@@ -31,7 +32,7 @@ def get_student_list(course_or_section):
         list: of `canvasapi.student.Student`.
     """
     students = []
-    for enrollee in course_or_section.get_enrollments():
+    for enrollee in course_or_section.get_enrollments(per_page=100):
         # TODO: See if we also need to check for active enrollment
         if enrollee.role == "StudentEnrollment":
             students += [enrollee]
@@ -66,11 +67,22 @@ def download_classlist(course, *, section=None, server_dir="."):
     """
     server_dir = Path(server_dir)
     if section:
-        enrollments_raw = section.get_enrollments()
+        enrollments_raw = section.get_enrollments(per_page=100)
     else:
-        enrollments_raw = course.get_enrollments()
+        enrollments_raw = course.get_enrollments(per_page=100)
     students = [_ for _ in enrollments_raw if _.role == "StudentEnrollment"]
 
+    # Look up the name of each section once, several at a time: each
+    # is a separate round-trip to Canvas.
+    section_ids = list({stud.course_section_id for stud in students})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        secnames = dict(
+            zip(
+                section_ids,
+                executor.map(lambda i: course.get_section(i).name, section_ids),
+            )
+        )
+
     # FIXME: This should probably contain checks to make sure we get
     # no collisions.
     default_id = 0  # ? not sure how many digits this can be. I've seen 5-7
@@ -83,8 +95,6 @@ def download_classlist(course, *, section=None, server_dir="."):
 
     conversion = [("Internal Canvas ID", "Student", "SIS User ID")]
 
-    secnames = {}
-
     for stud in students:
         stud_name, stud_id, stud_sis_id, stud_sis_login_id = (
             stud.user["sortable_name"],
@@ -139,10 +149,6 @@ def download_classlist(course, *, section=None, server_dir="."):
 
         # TODO: presumably this is just `section` when that is non-None?
         section_id = stud.course_section_id
-        if not secnames.get(section_id):
-            # caching section names
-            sec = course.get_section(section_id)
-            secnames[section_id] = sec.name
 
         # Add this information to the table we'll write out to the CSV
         classlist += [
@@ -169,29 +175,17 @@ def download_classlist(course, *, section=None, server_dir="."):
 
 def get_conversion_table(server_dir="."):
     """A mapping Canvas ID to Name and SIS ID."""
-    server_dir = Path(server_dir)
-    conversion = {}
-    with open(server_dir / "conversion.csv", "r") as csvfile:
-        reader = csv.reader(csvfile, delimiter=",", quotechar='"')
-        for i, row in enumerate(reader):
-            if i == 0:
-                continue
-            else:
-                conversion[row[0]] = row[1:]
-    return conversion
+    df = pandas.read_csv(
+        Path(server_dir) / "conversion.csv", dtype=str, keep_default_na=False
+    )
+    return dict(zip(df.iloc[:, 0], df.iloc[:, 1:].values.tolist()))
 
 
 def get_sis_id_to_canvas_id_table(server_dir="."):
-    server_dir = Path(server_dir)
-    sis_id_to_canvas = {}
-    with open(server_dir / "classlist.csv", "r") as csvfile:
-        reader = csv.reader(csvfile, delimiter=",", quotechar='"')
-        for i, row in enumerate(reader):
-            if i == 0:
-                continue
-            else:
-                sis_id_to_canvas[row[-1]] = row[1]
-    return sis_id_to_canvas
+    df = pandas.read_csv(
+        Path(server_dir) / "classlist.csv", dtype=str, keep_default_na=False
+    )
+    return dict(zip(df.iloc[:, -1], df.iloc[:, 1]))
 
 
 def get_courses_teaching(user):
@@ -204,7 +198,7 @@ def get_courses_teaching(user):
         list: List of `canvasapi.course.Course` objects.
     """
     courses_teaching = []
-    for course in user.get_courses():
+    for course in user.get_courses(per_page=100):
         try:
             for enrollee in course.enrollments:
                 if enrollee["user_id"] == user.id:
@@ -267,7 +261,7 @@ def interactively_get_section(course, can_choose_none=True):
     if not can_choose_none:
         raise NotImplementedError("Sorry, not implemented yet")
 
-    sections = list(course.get_sections())
+    sections = list(course.get_sections(per_page=100))
     i = 0
     if can_choose_none:
         print(
@@ -306,6 +300,7 @@ def interactively_get_assignment(course, **kw):
     print("  Available assignments:")
     print("  --------------------------------------------------------------------")
 
+    kw.setdefault("per_page", 100)
     assignments = list(course.get_assignments(**kw))
     for i, assignment in enumerate(assignments):
         print(f"    {i}: {assignment.name}")
@@ -349,6 +344,7 @@ def get_course_by_id_number(course_number, user):
 
 
 def get_assignment_by_id_number(course, num, **kw):
+    kw.setdefault("per_page", 100)
     for assignment in course.get_assignments(**kw):
         if assignment.id == num:
             return assignment
@@ -356,7 +352,7 @@ def get_assignment_by_id_number(course, num, **kw):
 
 
 def get_section_by_id_number(course, num):
-    for section in course.get_sections():
+    for section in course.get_sections(per_page=100):
         if section.id == num:
             return section
     raise ValueError(f"Could not find section matching id={num}")
@@ -426,22 +422,26 @@ def sis_id_to_student_dict(student_list):
 
 
 
-def get_sis_id_to_marks(headers=['Total'], post_process=lambda x: x):
+def _identity(x):
+    return x
+
+
+def get_sis_id_to_marks(headers=['Total'], post_process=_identity):
     """A dictionary of the Student Number ("sis id") to the marks specified by the csv headers in the List/tuple `headers` (default: ['Total']).
     Marks can be post-processed by an arbitrary function `post_process` (default: no op). """
 
-    df = pandas.read_csv("marks.csv", dtype="object")
-    d = df.set_index("StudentID")[headers].to_dict()
-
+    df = pandas.read_csv("marks.csv", dtype="object").set_index("StudentID")[headers]
 
+    # let pandas build the dict, only calling `post_process` if there is one
     if len(headers)==1:
-        marks = [ post_process(m) for m in d[headers[0]].values()]
-    else:
-        marks = [ [post_process(m) for m in marks] for marks in zip(*[d[h].values() for h in headers])]
-
-    ids = list(d[headers[0]].keys())
-
-    return {id:mark for id, mark in zip(ids, marks)}
+        marks = df[headers[0]]
+        if post_process is not _identity:
+            marks = marks.map(post_process)
+        return marks.to_dict()
+
+    if post_process is not _identity:
+        df = df.apply(lambda col: col.map(post_process))
+    return dict(zip(df.index, df.values.tolist()))
 
 
     # TODO: capacity to specify the csv file(s) - would be nice to have the ability to read from multiple files
@@ -616,6 +616,8 @@ class Chooser(QDialog):
             return
         if spec:
             self._set_restrictions_from_spec(spec)
+        # we may sit idle on this screen: keep the connection warm
+        self.messenger.start_keepalive()
         self.ui.loginInfoLabel.setText(f'logged in as "{user}"')
         self.ui.logoutButton.setVisible(True)
         self.ui.userLE.setEnabled(False)
@@ -1863,10 +1863,15 @@ class MarkerClient(QWidget):
             self.workingDirectory,
             "solution.{}.{}.png".format(self.question, self.version),
         )
+        # stream into a temp file and only move it into place once complete,
+        # otherwise a failed download would be cached as the solution
+        fh = tempfile.NamedTemporaryFile(
+            dir=self.workingDirectory, suffix=".png", delete=False
+        )
         try:
-            im_bytes = self.msgr.getSolutionImage(self.question, self.version)
-            with open(soln, "wb") as fh:
-                fh.write(im_bytes)
+            with fh:
+                self.msgr.getSolutionImage(self.question, self.version, sink=fh)
+            os.replace(fh.name, soln)
             return soln
         except PlomNoSolutionException as e:
             log.warning(f"no solution image: {e}")
@@ -1874,6 +1879,9 @@ class MarkerClient(QWidget):
             if os.path.isfile(soln):
                 os.remove(soln)
             return None
+        finally:
+            if os.path.isfile(fh.name):
+                os.unlink(fh.name)
 
     def saveTabStateToServer(self, tab_state):
         """Upload a tab state to the server."""
@@ -369,6 +369,30 @@ def scribble_pages(pdf_doc, exclude=(0, 1)):
         assert excess > 0
 
 
+def scribble_pdf_bytes(pdf_bytes, *, student_number=None, student_name=None):
+    """Scribble on a pdf given as bytes, returning the scribbled pdf as bytes.
+
+    This is a self-contained wrapper around :func:`scribble_name_and_id`
+    and :func:`scribble_pages`, suitable for use in a worker process.
+
+    Arguments:
+        pdf_bytes (bytes): the contents of a pdf file.
+
+    Keyword Args:
+        student_number (str/None): if given, write this number and
+            ``student_name`` on the coverpage.
+        student_name (str/None)
+
+    Returns:
+        bytes: the contents of the scribbled pdf file.
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+        if student_number is not None:
+            scribble_name_and_id(pdf_doc, student_number, student_name)
+        scribble_pages(pdf_doc)
+        return pdf_doc.tobytes()
+
+
 def fill_in_fake_data_on_exams(paper_dir, classlist, outfile, *, which=None):
     """Fill-in exams with fake data for demo or testing.
 
@@ -112,10 +112,9 @@ def assemble_solutions(
             print("All solutions present.")
             print(f"Downloading solution images to temp directory {tmp}")
         for q, v, md5 in tqdm(solutionList):
-            img = msgr.getSolutionImage(q, v)
             filename = tmp / f"solution.{q}.{v}.png"
             with open(filename, "wb") as f:
-                f.write(img)
+                msgr.getSolutionImage(q, v, sink=f)
 
         completedTests = msgr.RgetCompletionStatus()
         # dict testnumber -> [scanned, id'd, #q's marked]
@@ -70,15 +70,14 @@ def _download_page_images(msgr, tmpdir, num_questions, t, which: str) -> list:
         The filenames of the marked page files.
     """
     pagedata = msgr.get_pagedata(t)
+    # Issue #2707: better use a image-type key
+    pagedata = [r for r in pagedata if r["pagename"].casefold().startswith(which)]
+    images = msgr.get_images_bulk([(row["id"], row["md5"]) for row in pagedata])
 
     pages = []
-    for row in pagedata:
-        # Issue #2707: better use a image-type key
-        if not row["pagename"].casefold().startswith(which):
-            continue
+    for row, img_bytes in zip(pagedata, images):
         ext = Path(row["server_path"]).suffix
         filename = tmpdir / f'img_{int(t):04}_{row["pagename"]}{ext}'
-        img_bytes = msgr.get_image(row["id"], row["md5"])
         with open(filename, "wb") as f:
             f.write(img_bytes)
         pages.append({"filename": filename, "rotation": row["orientation"]})
@@ -97,9 +96,10 @@ def _download_annotation_images(msgr, tmpdir, num_questions, t) -> list:
     Returns:
         The filenames of the marked page files.
     """
+    questions = range(1, num_questions + 1)
+    annot_images = msgr.get_annotations_images_bulk([(t, q) for q in questions])
     marked_pages = []
-    for q in range(1, num_questions + 1):
-        annot_img_info, annot_img_bytes = msgr.get_annotations_image(t, q)
+    for q, (annot_img_info, annot_img_bytes) in zip(questions, annot_images):
         im_type = annot_img_info["extension"]
         filename = tmpdir / f"img_{int(t):04}_q{q:02}.{im_type}"
         marked_pages.append(filename)
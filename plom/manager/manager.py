@@ -2478,15 +2478,16 @@ class Manager(QWidget):
         howmany = len(ri) // mod
         howmany = "1 question" if howmany == 1 else f"{howmany} questions"
         self.ui.reviewIDTW.setSortingEnabled(False)
-        # TODO: this loop is expensive when many rows highlighted
         # TODO: maybe just use the 7th column instead of talking to server
-        tags = set()
+        tasks = []
         for tmp in ri[::mod]:
             r = tmp.row()
             paper = int(self.ui.reviewTW.item(r, 0).text())
             question = int(self.ui.reviewTW.item(r, 1).text())
-            task = f"q{paper:04}g{question}"
-            tags.update(self.msgr.get_tags(task))
+            tasks.append(f"q{paper:04}g{question}")
+        tags = set()
+        for task_tags in self.msgr.get_tags_many(tasks).values():
+            tags.update(task_tags)
         all_tags = [tag for key, tag in self.msgr.get_all_tags()]
         tag_choices = [X for X in all_tags if X not in tags]
         artd = AddRemoveTagDialog(self, tags, tag_choices, label=howmany)
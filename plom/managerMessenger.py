@@ -4,7 +4,6 @@
 # Copyright (C) 2022 Edith Coates
 
 import hashlib
-from io import BytesIO
 import json
 
 import requests
@@ -56,27 +55,25 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException: login troubles.
             PlomSeriousException: unexpected errors.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/initialiseDB",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "version_map": version_map,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 409:
-                raise PlomExistingDatabase(response.reason) from None
-            if response.status_code == 400:
-                raise PlomServerNotReady(response.reason) from None
-            raise PlomSeriousException("Unexpected {}".format(e)) from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/initialiseDB",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "version_map": version_map,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 409:
+                    raise PlomExistingDatabase(response.reason) from None
+                if response.status_code == 400:
+                    raise PlomServerNotReady(response.reason) from None
+                raise PlomSeriousException("Unexpected {}".format(e)) from None
 
         # JSON casts dict keys to str, force back to ints
         return undo_json_packing_of_version_map(response.json())
@@ -119,19 +116,18 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException("Unexpected {}".format(e)) from None
 
     def getGlobalPageVersionMap(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/plom/admin/pageVersionMap",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                elif response.status_code == 409:
-                    raise PlomConflict(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get(
+                "/plom/admin/pageVersionMap",
+                json={"user": self.user, "token": self.token},
+            )
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if response.status_code == 401:
+                raise PlomAuthenticationException() from None
+            elif response.status_code == 409:
+                raise PlomConflict(response.reason) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
         # JSON casts dict keys to str, force back to ints
         return undo_json_packing_of_version_map(response.json())
 
@@ -268,30 +264,28 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException: login problems.
             PlomSeriousException: other errors.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/ID/classlist",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "classlist": classdict,
-                    "force": force,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code == 409:
-                raise PlomConflict(response.reason) from None
-            if response.status_code == 400 and "no spec" in response.reason:
-                raise PlomServerNotReady(response.reason) from None
-            if response.status_code == 406:
-                raise PlomRangeException(response.reason) from None
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/ID/classlist",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "classlist": classdict,
+                        "force": force,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 409:
+                    raise PlomConflict(response.reason) from None
+                if response.status_code == 400 and "no spec" in response.reason:
+                    raise PlomServerNotReady(response.reason) from None
+                if response.status_code == 406:
+                    raise PlomRangeException(response.reason) from None
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def upload_spec(self, specdata):
         """Give the server a specification.
@@ -329,7 +323,6 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def RgetCompletionStatus(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/completionStatus",
@@ -340,13 +333,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def RgetStatus(self, test):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 f"/REP/status/{test}",
@@ -359,13 +349,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 404:
                 raise PlomSeriousException(f"Could not find test {test}.") from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getScannedTests(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/scanned",
@@ -381,11 +368,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getIncompleteTests(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/incomplete",
@@ -401,11 +385,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getDanglingPages(self):
-        self.SRmutex.acquire()
         # Note: long timeout, slow for large (1000s) of papers
         timeout = (self.default_timeout[0], 10 * self.default_timeout[1])
         try:
@@ -424,25 +405,21 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def RgetSpreadsheet(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/REP/spreadsheet",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get(
+                "/REP/spreadsheet",
+                json={"user": self.user, "token": self.token},
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def IDprogressCount(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/ID/progress",
@@ -456,13 +433,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return progress
 
     def IDgetImageList(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/TMP/imageList",
@@ -475,8 +449,6 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return imageList
 
@@ -485,7 +457,6 @@ class ManagerMessenger(BaseMessenger):
 
         DEPRECATED: only legacy servers do this.
         """
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/ID/randomImage",
@@ -494,9 +465,7 @@ class ManagerMessenger(BaseMessenger):
             response.raise_for_status()
             imageList = []
             for img in MultipartDecoder.from_response(response).parts:
-                imageList.append(
-                    BytesIO(img.content).getvalue()
-                )  # pass back image as bytes
+                imageList.append(img.content)  # pass back image as bytes
             return imageList
         except requests.HTTPError as e:
             if response.status_code in (401, 403):
@@ -504,11 +473,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 410:
                 raise PlomNoMoreException("Cannot find ID image.") from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getProgress(self, q, v):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/progress",
@@ -524,11 +490,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getQuestionUserProgress(self, q, v):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/questionUserProgress",
@@ -544,11 +507,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getMarkHistogram(self, q, v):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/markHistogram",
@@ -564,8 +524,6 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def replaceMissingTestPage(self, t, p, v):
         """Replace a do-not-mark page with a server-generated placeholder.
@@ -658,114 +616,41 @@ class ManagerMessenger(BaseMessenger):
 
     def replaceMissingHWQuestion(self, student_id=None, test=None, question=None):
         # can replace by SID or by test-number
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/missingHWQuestion",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "question": question,
-                    "sid": student_id,
-                    "test": test,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 404:
-                raise PlomSeriousException(
-                    "Server could not find the TPV - this should not happen!"
-                ) from None
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            if response.status_code == 405:  # that question already has pages
-                raise PlomTakenException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
-
-    def removeSinglePage(self, test_number, page_name):
-        self.SRmutex.acquire()
-        try:
-            response = self.delete(
-                "/plom/admin/singlePage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "test": test_number,
-                    "page_name": page_name,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code in (406, 409, 410):
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
-
-    def removeAllScannedPages(self, test_number):
-        self.SRmutex.acquire()
-        try:
-            response = self.delete(
-                "/plom/admin/scannedPages",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "test": test_number,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 404:
-                raise PlomSeriousException(
-                    "Server could not find the page - this should not happen!"
-                ) from None
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
-
-    def getTPageImageData(self, t, p, v):
         with self.SRmutex:
             try:
-                response = self.get(
-                    "/plom/admin/scannedTPage",
+                response = self.put(
+                    "/plom/admin/missingHWQuestion",
                     json={
                         "user": self.user,
                         "token": self.token,
-                        "test": t,
-                        "page": p,
-                        "version": v,
+                        "question": question,
+                        "sid": student_id,
+                        "test": test,
                     },
                 )
                 response.raise_for_status()
                 return response.json()
             except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 400:
-                    # TODO? do something else?
-                    return None
+                if response.status_code == 404:
+                    raise PlomSeriousException(
+                        "Server could not find the TPV - this should not happen!"
+                    ) from None
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                if response.status_code == 405:  # that question already has pages
+                    raise PlomTakenException() from None
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
-    def getHWPageImageData(self, t, q, o):
+    def removeSinglePage(self, test_number, page_name):
         with self.SRmutex:
             try:
-                response = self.get(
-                    "/plom/admin/scannedHWPage",
+                response = self.delete(
+                    "/plom/admin/singlePage",
                     json={
                         "user": self.user,
                         "token": self.token,
-                        "test": t,
-                        "question": q,
-                        "order": o,
+                        "test": test_number,
+                        "page_name": page_name,
                     },
                 )
                 response.raise_for_status()
@@ -773,36 +658,99 @@ class ManagerMessenger(BaseMessenger):
             except requests.HTTPError as e:
                 if response.status_code in (401, 403):
                     raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 400:
-                    # TODO? do something else?
-                    return None
+                if response.status_code in (406, 409, 410):
+                    raise PlomConflict(response.reason) from None
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
-    def getEXPageImageData(self, t, q, o):
+    def removeAllScannedPages(self, test_number):
         with self.SRmutex:
             try:
-                response = self.get(
-                    "/plom/admin/scannedEXPage",
+                response = self.delete(
+                    "/plom/admin/scannedPages",
                     json={
                         "user": self.user,
                         "token": self.token,
-                        "test": t,
-                        "question": q,
-                        "order": o,
+                        "test": test_number,
                     },
                 )
                 response.raise_for_status()
                 return response.json()
             except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 400:
-                    # TODO? do something else?
-                    return None
+                if response.status_code == 404:
+                    raise PlomSeriousException(
+                        "Server could not find the page - this should not happen!"
+                    ) from None
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
+    def getTPageImageData(self, t, p, v):
+        try:
+            response = self.get(
+                "/plom/admin/scannedTPage",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "test": t,
+                    "page": p,
+                    "version": v,
+                },
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            if response.status_code == 400:
+                # TODO? do something else?
+                return None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
+
+    def getHWPageImageData(self, t, q, o):
+        try:
+            response = self.get(
+                "/plom/admin/scannedHWPage",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "test": t,
+                    "question": q,
+                    "order": o,
+                },
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            if response.status_code == 400:
+                # TODO? do something else?
+                return None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
+
+    def getEXPageImageData(self, t, q, o):
+        try:
+            response = self.get(
+                "/plom/admin/scannedEXPage",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "test": t,
+                    "question": q,
+                    "order": o,
+                },
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            if response.status_code == 400:
+                # TODO? do something else?
+                return None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
+
     def getCollidingImage(self, fname):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/collidingImage",
@@ -813,7 +761,7 @@ class ManagerMessenger(BaseMessenger):
                 },
             )
             response.raise_for_status()
-            image = BytesIO(response.content).getvalue()
+            image = response.content
             return image
         except requests.HTTPError as e:
             if response.status_code == 401:
@@ -821,8 +769,6 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 404:
                 return None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def removeUnknownImage(self, fname):
         """Discard an UnknownPage.
@@ -860,29 +806,26 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def removeCollidingImage(self, fname):
-        self.SRmutex.acquire()
-        try:
-            response = self.delete(
-                "/plom/admin/collidingImage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            if response.status_code == 404:
-                return False
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.delete(
+                    "/plom/admin/collidingImage",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                if response.status_code == 404:
+                    return False
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
         return True
 
     def checkTPage(self, testNumber, pageNumber):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/checkTPage",
@@ -898,7 +841,7 @@ class ManagerMessenger(BaseMessenger):
             vimg = MultipartDecoder.from_response(response).parts
             ver = int(vimg[1].content)
             if len(vimg) == 3:  # just look at length - sufficient for now?
-                rval = [ver, BytesIO(vimg[2].content).getvalue()]
+                rval = [ver, vimg[2].content]
             else:
                 rval = [ver, None]
             return rval  # [v, None] or [v, image1]
@@ -910,8 +853,6 @@ class ManagerMessenger(BaseMessenger):
                     "Cannot find image file for {}.".format(testNumber)
                 ) from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def unknownToTestPage(self, fname, test, page, theta):
         """Map UnknownPage onto a TestPage.
@@ -929,32 +870,30 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException
             PlomConflict
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/unknownToTestPage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                    "test": test,
-                    "page": page,
-                    "rotation": theta,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            # Currently the route does not do this
-            # if response.status_code == 406:
-            #    raise PlomOwnersLoggedInException(response.reason) from None
-            if response.status_code == 409:
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/unknownToTestPage",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                        "test": test,
+                        "page": page,
+                        "rotation": theta,
+                    },
+                )
+                response.raise_for_status()
+                return response.json()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                # Currently the route does not do this
+                # if response.status_code == 406:
+                #    raise PlomOwnersLoggedInException(response.reason) from None
+                if response.status_code == 409:
+                    raise PlomConflict(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def unknownToExtraPage(self, fname, test, questions, theta):
         """Map Unknown Page to an Extra Page.
@@ -966,31 +905,29 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException
             PlomConflict
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/unknownToExtraPage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                    "test": test,
-                    "questions": questions,
-                    "rotation": theta,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            # Currently the route does not do this
-            # if response.status_code == 406:
-            #     raise PlomOwnersLoggedInException(response.reason) from None
-            if response.status_code == 409:
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/unknownToExtraPage",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                        "test": test,
+                        "questions": questions,
+                        "rotation": theta,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                # Currently the route does not do this
+                # if response.status_code == 406:
+                #     raise PlomOwnersLoggedInException(response.reason) from None
+                if response.status_code == 409:
+                    raise PlomConflict(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def unknownToHWPage(self, fname, test, questions, theta):
         """Map Unknown Page to a Homework Page.
@@ -1002,76 +939,70 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException
             PlomConflict
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/unknownToHWPage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                    "test": test,
-                    "questions": questions,
-                    "rotation": theta,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            # Currently the route does not do this
-            # if response.status_code == 406:
-            #     raise PlomOwnersLoggedInException(response.reason) from None
-            if response.status_code == 409:
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/unknownToHWPage",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                        "test": test,
+                        "questions": questions,
+                        "rotation": theta,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                # Currently the route does not do this
+                # if response.status_code == 406:
+                #     raise PlomOwnersLoggedInException(response.reason) from None
+                if response.status_code == 409:
+                    raise PlomConflict(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def collidingToTestPage(self, fname, test, page, version):
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/collidingToTestPage",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                    "test": test,
-                    "page": page,
-                    "version": version,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 406:
-                raise PlomOwnersLoggedInException(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/collidingToTestPage",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                        "test": test,
+                        "page": page,
+                        "version": version,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 406:
+                    raise PlomOwnersLoggedInException(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def discardToUnknown(self, fname):
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/discardToUnknown",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "fileName": fname,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 406:
-                return False
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/discardToUnknown",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "fileName": fname,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 406:
+                    return False
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
         return True
 
     def ID_delete_machine_predictions(self):
@@ -1155,18 +1086,17 @@ class ManagerMessenger(BaseMessenger):
             PlomAuthenticationException:
             PlomSeriousException: something unexpected.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/ID/id_reader",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get(
+                "/ID/id_reader",
+                json={"user": self.user, "token": self.token},
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def id_reader_run(self, top, bottom, *, ignore_timestamp):
         """Runs the id digit reader on the ID pages of all papers.
@@ -1181,28 +1111,26 @@ class ManagerMessenger(BaseMessenger):
         Raises:
             PlomAuthenticationException:
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.post_auth(
-                "/ID/id_reader",
-                json={
-                    "crop_top": top,
-                    "crop_bottom": bottom,
-                    "ignore_timestamp": ignore_timestamp,
-                },
-            )
-            response.raise_for_status()
-            if response.status_code == 202:
-                return [True, False, *response.json()]
-            if response.status_code == 205:
-                return [False, None, *response.json()]
-            return [True, True, *response.json()]
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.post_auth(
+                    "/ID/id_reader",
+                    json={
+                        "crop_top": top,
+                        "crop_bottom": bottom,
+                        "ignore_timestamp": ignore_timestamp,
+                    },
+                )
+                response.raise_for_status()
+                if response.status_code == 202:
+                    return [True, False, *response.json()]
+                if response.status_code == 205:
+                    return [False, None, *response.json()]
+                return [True, True, *response.json()]
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def id_reader_kill(self):
         """Kill a running background id digit reader job.
@@ -1228,7 +1156,6 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def getIdentified(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/identified",
@@ -1240,11 +1167,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getNotAutoIdentified(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/notautoid",
@@ -1259,11 +1183,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getUserList(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/userList",
@@ -1278,11 +1199,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getUserDetails(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/userDetails",
@@ -1297,164 +1215,148 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getMarkReview(
         self, *, filterPaperNumber, filterQ, filterV, filterUser, filterMarked
     ):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/REP/markReview",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "filterPaperNumber": filterPaperNumber,
-                        "filterQ": filterQ,
-                        "filterV": filterV,
-                        "filterUser": filterUser,
-                        "filterMarked": filterMarked,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
-
-    def getIDReview(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
-                "/REP/idReview",
+                "/REP/markReview",
                 json={
                     "user": self.user,
                     "token": self.token,
+                    "filterPaperNumber": filterPaperNumber,
+                    "filterQ": filterQ,
+                    "filterV": filterV,
+                    "filterUser": filterUser,
+                    "filterMarked": filterMarked,
                 },
             )
             response.raise_for_status()
             return response.json()
         except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
-    def clearAuthorisationUser(self, someuser):
-        self.SRmutex.acquire()
+    def getIDReview(self):
         try:
-            response = self.delete(
-                f"/authorisation/{someuser}",
-                json={"user": self.user, "token": self.token},
+            response = self.get(
+                "/REP/idReview",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                },
             )
             response.raise_for_status()
+            return response.json()
         except requests.HTTPError as e:
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+
+    def clearAuthorisationUser(self, someuser):
+        with self.SRmutex:
+            try:
+                response = self.delete(
+                    f"/authorisation/{someuser}",
+                    json={"user": self.user, "token": self.token},
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def enableUser(self, someuser):
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                f"/enable/{someuser}",
-                json={"user": self.user, "token": self.token},
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 400:
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    f"/enable/{someuser}",
+                    json={"user": self.user, "token": self.token},
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 400:
+                    raise PlomConflict(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def disableUser(self, someuser):
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                f"/disable/{someuser}",
-                json={"user": self.user, "token": self.token},
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 400:
-                raise PlomConflict(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    f"/disable/{someuser}",
+                    json={"user": self.user, "token": self.token},
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 400:
+                    raise PlomConflict(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def createUser(self, someuser, password):
-        self.SRmutex.acquire()
-        try:
-            response = self.post_auth(
-                f"/authorisation/{someuser}", json={"password": password}
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code == 406:
-                return [False, response.text]
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.post_auth(
+                    f"/authorisation/{someuser}", json={"password": password}
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 406:
+                    return [False, response.text]
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
         if response.status_code == 200:
             return [True, "User created."]
         raise PlomSeriousException(f"Unexpected {response.status_code}") from None
 
     def changeUserPassword(self, someuser, password):
-        self.SRmutex.acquire()
-        try:
-            response = self.patch(
-                f"/authorisation/{someuser}",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "password": password,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code == 406:
-                return [False, response.text]
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.patch(
+                    f"/authorisation/{someuser}",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "password": password,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 406:
+                    return [False, response.text]
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
         if response.status_code == 200:
             return [True, "User password updated."]
         raise PlomSeriousException(f"Unexpected {response.status_code}") from None
 
     def MrevertTask(self, code):
-        self.SRmutex.acquire()
-        try:
-            response = self.patch(
-                f"/MK/revert/{code}",
-                json={"user": self.user, "token": self.token},
-            )
-            response.raise_for_status()
-            if response.status_code == 204:
-                raise PlomBenignException("No action to be taken.")
+        with self.SRmutex:
+            try:
+                response = self.patch(
+                    f"/MK/revert/{code}",
+                    json={"user": self.user, "token": self.token},
+                )
+                response.raise_for_status()
+                if response.status_code == 204:
+                    raise PlomBenignException("No action to be taken.")
 
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            elif response.status_code == 409:
-                raise PlomConflict(response.reason) from None
-            else:
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                elif response.status_code == 409:
+                    raise PlomConflict(response.reason) from None
+                else:
+                    raise PlomSeriousException(
+                        f"Some other sort of error {e}"
+                    ) from None
 
     def MreviewQuestion(self, paper_number, question):
         with self.SRmutex:
@@ -1479,28 +1381,25 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def IDreviewID(self, testNumber):
-        self.SRmutex.acquire()
-        try:
-            response = self.patch(
-                "/ID/review",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "testNumber": testNumber,
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            if response.status_code in (401, 403):
-                raise PlomAuthenticationException(response.reason) from None
-            if response.status_code == 404:
-                raise PlomSeriousException(response.reason) from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.patch(
+                    "/ID/review",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "testNumber": testNumber,
+                    },
+                )
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code in (401, 403):
+                    raise PlomAuthenticationException(response.reason) from None
+                if response.status_code == 404:
+                    raise PlomSeriousException(response.reason) from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def RgetOutToDo(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/outToDo",
@@ -1512,11 +1411,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def RgetMarked(self, q, v):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/marked",
@@ -1527,8 +1423,6 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
@@ -1564,34 +1458,31 @@ class ManagerMessenger(BaseMessenger):
                 raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def deleteSolutionImage(self, question, version):
-        self.SRmutex.acquire()
-        try:
-            response = self.delete(
-                "/plom/admin/solution",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "question": question,
-                    "version": version,
-                },
-            )
-            response.raise_for_status()
-            if response.status_code == 200:
-                return True
-            # if response.status_code == 204:
-            return False
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.delete(
+                    "/plom/admin/solution",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "question": question,
+                        "version": version,
+                    },
+                )
+                response.raise_for_status()
+                if response.status_code == 200:
+                    return True
+                # if response.status_code == 204:
+                return False
+            except requests.HTTPError as e:
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     # =====
     # Rubric analysis stuff
 
     def RgetTestRubricMatrix(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/test_rubric_matrix",
@@ -1602,13 +1493,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def RgetRubricCounts(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/rubric/counts",
@@ -1619,13 +1507,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def RgetRubricDetails(self, key):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 f"/REP/rubric/{key}",
@@ -1636,8 +1521,6 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
@@ -1645,7 +1528,6 @@ class ManagerMessenger(BaseMessenger):
     # Bundle image stuff
 
     def getBundleFromImage(self, filename):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/bundleFromImage",
@@ -1658,17 +1540,18 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 410:
                 raise PlomNoMoreException("Cannot find that image.") from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getImagesInBundle(self, bundle_name):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/imagesInBundle",
-                json={"user": self.user, "token": self.token, "bundle": bundle_name},
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "bundle": bundle_name,
+                },
             )
             response.raise_for_status()
         except requests.HTTPError as e:
@@ -1677,13 +1560,10 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 410:
                 raise PlomNoMoreException("Cannot find that bundle.") from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getPageFromBundle(self, bundle_name, image_position):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/bundlePage",
@@ -1695,7 +1575,7 @@ class ManagerMessenger(BaseMessenger):
                 },
             )
             response.raise_for_status()
-            image = BytesIO(response.content).getvalue()
+            image = response.content
             return image
         except requests.HTTPError as e:
             if response.status_code == 401:
@@ -1703,11 +1583,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 410:
                 raise PlomNoMoreException("Cannot find that image / bundle.") from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def RgetCompletions(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/completions",
@@ -1719,11 +1596,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def RgetCoverPageInfo(self, test):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 f"/REP/coverPageInfo/{test}",
@@ -1735,11 +1609,8 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def RgetOriginalFiles(self, testNumber):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 f"/REP/originalFiles/{testNumber}",
@@ -1751,19 +1622,16 @@ class ManagerMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def getFilesInAllTests(self):
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/REP/filesInAllTests",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code in (401, 403):
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        try:
+            response = self.get(
+                "/REP/filesInAllTests",
+                json={"user": self.user, "token": self.token},
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            if response.status_code in (401, 403):
+                raise PlomAuthenticationException(response.reason) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
@@ -5,7 +5,6 @@
 """Backend bits 'n bobs to talk to a Plom server."""
 
 import hashlib
-from io import BytesIO
 import json
 import logging
 import mimetypes
@@ -14,7 +13,7 @@ from typing import Union, Tuple
 import requests
 from requests_toolbelt import MultipartEncoder
 
-from plom.baseMessenger import BaseMessenger
+from plom.baseMessenger import BaseMessenger, _check, _AUTH_ERRORS
 from plom.scanMessenger import ScanMessenger
 from plom.managerMessenger import ManagerMessenger
 from plom.plom_exceptions import PlomSeriousException
@@ -41,6 +40,23 @@ log = logging.getLogger("messenger")
 # requests_log.setLevel(logging.DEBUG)
 # requests_log.propagate = True
 
+# How the server's error codes map onto our exceptions, see :func:`_check`
+_ID_CLAIM_ERRORS = {401: PlomAuthenticationException, 409: PlomTakenException}
+_ID_RETURN_ERRORS = {
+    401: PlomAuthenticationException,
+    403: PlomTakenException,
+    404: PlomRangeException,
+    409: PlomConflict,
+}
+_MK_PROGRESS_ERRORS = {401: PlomAuthenticationException, 416: PlomRangeException}
+_MK_CLAIM_ERRORS = {
+    401: PlomAuthenticationException,
+    404: PlomRangeException,
+    409: PlomTakenException,
+    410: PlomRangeException,
+    417: PlomVersionMismatchException,
+}
+
 
 class Messenger(BaseMessenger):
     """Handle communication with a Plom Server."""
@@ -63,19 +79,12 @@ class Messenger(BaseMessenger):
             PlomAuthenticationException:
             PlomSeriousException: something unexpected happened.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/ID/progress",
-                    json={"user": self.user, "token": self.token},
-                )
-                # throw errors when response code != 200.
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get(
+            "/ID/progress",
+            json={"user": self.user, "token": self.token},
+        )
+        _check(response, _AUTH_ERRORS)
+        return response.json()
 
     def IDaskNextTask(self):
         """Return the TGV of a paper that needs IDing.
@@ -86,58 +95,34 @@ class Messenger(BaseMessenger):
         Raises:
             SeriousError: if something has unexpectedly gone wrong.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                "/ID/tasks/available",
-                json={"user": self.user, "token": self.token},
-            )
-            # throw errors when response code != 200.
-            response.raise_for_status()
-            if response.status_code == 204:
-                return None
-            tgv = response.json()
-            return tgv
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        response = self.get(
+            "/ID/tasks/available",
+            json={"user": self.user, "token": self.token},
+        )
+        _check(response, _AUTH_ERRORS)
+        if response.status_code == 204:
+            return None
+        tgv = response.json()
+        return tgv
 
     def IDrequestDoneTasks(self):
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                "/ID/tasks/complete",
-                json={"user": self.user, "token": self.token},
-            )
-            response.raise_for_status()
-            idList = response.json()
-            return idList
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        response = self.get(
+            "/ID/tasks/complete",
+            json={"user": self.user, "token": self.token},
+        )
+        _check(response, _AUTH_ERRORS)
+        idList = response.json()
+        return idList
 
     # ------------------------
 
     def IDclaimThisTask(self, code):
         with self.SRmutex:
-            try:
-                response = self.patch(
-                    f"/ID/tasks/{code}",
-                    json={"user": self.user, "token": self.token},
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 409:
-                    raise PlomTakenException(response.reason)
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response = self.patch(
+                f"/ID/tasks/{code}",
+                json={"user": self.user, "token": self.token},
+            )
+        _check(response, _ID_CLAIM_ERRORS)
 
     def IDreturnIDdTask(self, task, studentID, studentName):
         """Return a completed IDing task: identify a paper.
@@ -151,47 +136,28 @@ class Messenger(BaseMessenger):
             PlomSeriousException: other errors.
         """
         with self.SRmutex:
-            try:
-                response = self.put(
-                    f"/ID/tasks/{task}",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "sid": studentID,
-                        "sname": studentName,
-                    },
-                )
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                if response.status_code == 409:
-                    raise PlomConflict(response.reason) from None
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 403:
-                    raise PlomTakenException(response.reason) from None
-                if response.status_code == 404:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response = self.put(
+                f"/ID/tasks/{task}",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "sid": studentID,
+                    "sname": studentName,
+                },
+            )
+        _check(response, _ID_RETURN_ERRORS)
 
     # ------------------------
     # ------------------------
     # Marker stuff
     def MrequestDoneTasks(self, q, v):
-        self.SRmutex.acquire()
-        try:
-            response = self.get(
-                "/MK/tasks/complete",
-                json={"user": self.user, "token": self.token, "q": q, "v": v},
-            )
-            response.raise_for_status()
-            mList = response.json()
-            return mList
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        response = self.get(
+            "/MK/tasks/complete",
+            json={"user": self.user, "token": self.token, "q": q, "v": v},
+        )
+        _check(response, _AUTH_ERRORS)
+        mList = response.json()
+        return mList
 
     def MprogressCount(self, q, v):
         """Return info about progress on a particular question-version pair.
@@ -211,21 +177,12 @@ class Messenger(BaseMessenger):
             PlomSeriousException: something unexpected happened, such as
                 non-integer `q` or `v`.
         """
-        with self.SRmutex:
-            try:
-                response = self.get(
-                    "/MK/progress",
-                    json={"user": self.user, "token": self.token, "q": q, "v": v},
-                )
-                # throw errors when response code != 200.
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException(response.reason) from None
-                if response.status_code == 416:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+        response = self.get(
+            "/MK/progress",
+            json={"user": self.user, "token": self.token, "q": q, "v": v},
+        )
+        _check(response, _MK_PROGRESS_ERRORS)
+        return response.json()
 
     def MaskNextTask(self, q, v, tag=None, above=None):
         """Ask server for a new marking task, return tgv or None.
@@ -251,40 +208,31 @@ class Messenger(BaseMessenger):
 
         TODO: why are we using json for a string return?
         """
-        self.SRmutex.acquire()
-        try:
-            if self.webplom:
-                response = self.get(
-                    f"/MK/tasks/available?q={q}&v={v}&above={above}&tag={tag}",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                    },
-                )
-            else:
-                response = self.get(
-                    "/MK/tasks/available",
-                    json={
-                        "user": self.user,
-                        "token": self.token,
-                        "q": q,
-                        "v": v,
-                        "above": above,
-                        "tag": tag,
-                    },
-                )
-            # throw errors when response code != 200.
-            if response.status_code == 204:
-                return None
-            response.raise_for_status()
-            tgv = response.json()
-            return tgv
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        if self.webplom:
+            response = self.get(
+                f"/MK/tasks/available?q={q}&v={v}&above={above}&tag={tag}",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                },
+            )
+        else:
+            response = self.get(
+                "/MK/tasks/available",
+                json={
+                    "user": self.user,
+                    "token": self.token,
+                    "q": q,
+                    "v": v,
+                    "above": above,
+                    "tag": tag,
+                },
+            )
+        if response.status_code == 204:
+            return None
+        _check(response, _AUTH_ERRORS)
+        tgv = response.json()
+        return tgv
 
     def MclaimThisTask(self, code, version):
         """Claim a task from server and get back metadata.
@@ -304,25 +252,12 @@ class Messenger(BaseMessenger):
             PlomSeriousException: generic unexpected error
         """
         with self.SRmutex:
-            try:
-                response = self.patch(
-                    f"/MK/tasks/{code}",
-                    json={"user": self.user, "token": self.token, "version": version},
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 409:
-                    raise PlomTakenException(response.reason) from None
-                if response.status_code == 417:
-                    raise PlomVersionMismatchException(response.reason) from None
-                if response.status_code == 404:
-                    raise PlomRangeException(response.reason) from None
-                if response.status_code == 410:
-                    raise PlomRangeException(response.reason) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response = self.patch(
+                f"/MK/tasks/{code}",
+                json={"user": self.user, "token": self.token, "version": version},
+            )
+        _check(response, _MK_CLAIM_ERRORS)
+        return response.json()
 
     def MlatexFragment(self, latex: str) -> Tuple[bool, Union[bytes, str]]:
         """Give some text to the server, it comes back as a PNG image processed via TeX.
@@ -333,26 +268,26 @@ class Messenger(BaseMessenger):
         Returns:
             `(True, png_bytes)` or `(False, fail_reason)`.
         """
-        with self.SRmutex:
-            try:
+        try:
+            with self.SRmutex:
                 response = self.post_auth(
                     "/MK/latex",
                     json={"fragment": latex},
                 )
-                response.raise_for_status()
-                image = BytesIO(response.content).getvalue()
-                return (True, image)
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 406:
-                    r = response.json()
-                    assert r["error"]
-                    return (False, r["tex_output"])
-                    # raise PlomLatexException(
-                    #     f"Server reported an error processing your TeX fragment:\n\n{response.text}"
-                    # ) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+            response.raise_for_status()
+            image = response.content
+            return (True, image)
+        except requests.HTTPError as e:
+            if response.status_code == 401:
+                raise PlomAuthenticationException() from None
+            if response.status_code == 406:
+                r = response.json()
+                assert r["error"]
+                return (False, r["tex_output"])
+                # raise PlomLatexException(
+                #     f"Server reported an error processing your TeX fragment:\n\n{response.text}"
+                # ) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def MreturnMarkedTask(
         self,
@@ -414,66 +349,66 @@ class Messenger(BaseMessenger):
             )
 
         img_mime_type = mimetypes.guess_type(annotated_img)[0]
-        with self.SRmutex:
-            try:
-                with open(annotated_img, "rb") as fh, open(plomfile, "rb") as f2:
-                    # doesn't like ints, so convert ints to strings
-                    param = {
-                        "user": self.user,
-                        "token": self.token,
-                        "pg": str(pg),
-                        "ver": str(ver),
-                        "score": str(score),
-                        "mtime": str(round(marking_time)),
-                        "rubrics": rubrics,
-                        "md5sum": hashlib.md5(fh.read()).hexdigest(),
-                        "integrity_check": integrity_check,
-                        "image_md5s": image_md5_list,
+        try:
+            with open(annotated_img, "rb") as fh, open(plomfile, "rb") as f2:
+                # doesn't like ints, so convert ints to strings
+                param = {
+                    "user": self.user,
+                    "token": self.token,
+                    "pg": str(pg),
+                    "ver": str(ver),
+                    "score": str(score),
+                    "mtime": str(round(marking_time)),
+                    "rubrics": rubrics,
+                    "md5sum": hashlib.md5(fh.read()).hexdigest(),
+                    "integrity_check": integrity_check,
+                    "image_md5s": image_md5_list,
+                }
+                # reset stream position to start before reading again
+                fh.seek(0)
+                dat = MultipartEncoder(
+                    fields={
+                        "param": json.dumps(param),
+                        "annotated": (annotated_img.name, fh, img_mime_type),
+                        "plom": (plomfile.name, f2, "text/plain"),
                     }
-                    # reset stream position to start before reading again
-                    fh.seek(0)
-                    dat = MultipartEncoder(
-                        fields={
-                            "param": json.dumps(param),
-                            "annotated": (annotated_img.name, fh, img_mime_type),
-                            "plom": (plomfile.name, f2, "text/plain"),
-                        }
-                    )
-                    # increase read timeout relative to default: Issue #1575
-                    timeout = (self.default_timeout[0], 3 * self.default_timeout[1])
+                )
+                # increase read timeout relative to default: Issue #1575
+                timeout = (self.default_timeout[0], 3 * self.default_timeout[1])
+                with self.SRmutex:
                     response = self.put(
                         f"/MK/tasks/{code}",
                         data=dat,
                         headers={"Content-Type": dat.content_type},
                         timeout=timeout,
                     )
-                response.raise_for_status()
-                return response.json()
-            except (requests.ConnectionError, requests.Timeout) as e:
-                raise PlomTimeoutError(
-                    "Upload timeout/connect error: {}\n\n".format(e)
-                    + "Retries are NOT YET implemented: as a workaround,"
-                    + "you can re-open the Annotator on '{}'.\n\n".format(code)
-                    + "We will now process any remaining upload queue."
-                ) from None
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 406:
-                    if response.text == "integrity_fail":
-                        raise PlomConflict(
-                            "Integrity fail: can happen if manager altered task while you annotated"
-                        ) from None
-                    raise PlomSeriousException(response.text) from None
-                if response.status_code == 409:
-                    raise PlomTaskChangedError("Task ownership has changed.") from None
-                if response.status_code == 410:
-                    raise PlomTaskDeletedError(
-                        "No such task - it has been deleted from server."
+            response.raise_for_status()
+            return response.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise PlomTimeoutError(
+                "Upload timeout/connect error: {}\n\n".format(e)
+                + "Retries are NOT YET implemented: as a workaround,"
+                + "you can re-open the Annotator on '{}'.\n\n".format(code)
+                + "We will now process any remaining upload queue."
+            ) from None
+        except requests.HTTPError as e:
+            if response.status_code == 401:
+                raise PlomAuthenticationException() from None
+            if response.status_code == 406:
+                if response.text == "integrity_fail":
+                    raise PlomConflict(
+                        "Integrity fail: can happen if manager altered task while you annotated"
                     ) from None
-                if response.status_code == 400:
-                    raise PlomSeriousException(response.text) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+                raise PlomSeriousException(response.text) from None
+            if response.status_code == 409:
+                raise PlomTaskChangedError("Task ownership has changed.") from None
+            if response.status_code == 410:
+                raise PlomTaskDeletedError(
+                    "No such task - it has been deleted from server."
+                ) from None
+            if response.status_code == 400:
+                raise PlomSeriousException(response.text) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def _MreturnMarkedTask_webplom(
         self,
@@ -490,63 +425,63 @@ class Messenger(BaseMessenger):
 
         See :meth:`MreturnMarkedTask` for docs.
         """
-        with self.SRmutex:
-            try:
-                with open(annotated_img, "rb") as annot_img_file, open(
-                    plomfile, "rb"
-                ) as plom_data_file:
-                    data = {
-                        "pg": str(pg),
-                        "ver": str(ver),
-                        "score": str(score),
-                        "marking_time": marking_time,
-                        "md5sum": hashlib.md5(annot_img_file.read()).hexdigest(),
-                        "integrity_check": integrity_check,
-                    }
-
-                    annot_img_file.seek(0)
-
-                    # automatically puts the filename in
-                    files = {
-                        "annotation_image": annot_img_file,
-                        "plomfile": plom_data_file,
-                    }
-
-                    # increase read timeout relative to default: Issue #1575
-                    timeout = (self.default_timeout[0], 3 * self.default_timeout[1])
+        try:
+            with open(annotated_img, "rb") as annot_img_file, open(
+                plomfile, "rb"
+            ) as plom_data_file:
+                data = {
+                    "pg": str(pg),
+                    "ver": str(ver),
+                    "score": str(score),
+                    "marking_time": marking_time,
+                    "md5sum": hashlib.md5(annot_img_file.read()).hexdigest(),
+                    "integrity_check": integrity_check,
+                }
+
+                annot_img_file.seek(0)
+
+                # automatically puts the filename in
+                files = {
+                    "annotation_image": annot_img_file,
+                    "plomfile": plom_data_file,
+                }
+
+                # increase read timeout relative to default: Issue #1575
+                timeout = (self.default_timeout[0], 3 * self.default_timeout[1])
+                with self.SRmutex:
                     response = self.post_auth(
                         f"/MK/tasks/{code}",
                         data=data,
                         files=files,
                         timeout=timeout,
                     )
-                    response.raise_for_status()
-                    return response.json()
-            except (requests.ConnectionError, requests.Timeout) as e:
-                raise PlomTimeoutError(
-                    "Upload timeout/connect error: {}\n\n".format(e)
-                    + "Retries are NOT YET implemented: as a workaround,"
-                    + "you can re-open the Annotator on '{}'.\n\n".format(code)
-                    + "We will now process any remaining upload queue."
-                ) from None
-            except requests.HTTPError as e:
-                if response.status_code == 401:
-                    raise PlomAuthenticationException() from None
-                if response.status_code == 406:
-                    if response.text == "integrity_fail":
-                        raise PlomConflict(
-                            "Integrity fail: can happen if manager altered task while you annotated"
-                        ) from None
-                    raise PlomSeriousException(response.text) from None
-                if response.status_code == 409:
-                    raise PlomTaskChangedError("Task ownership has changed.") from None
-                if response.status_code == 410:
-                    raise PlomTaskDeletedError(
-                        "No such task - it has been deleted from server."
+                response.raise_for_status()
+                return response.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise PlomTimeoutError(
+                "Upload timeout/connect error: {}\n\n".format(e)
+                + "Retries are NOT YET implemented: as a workaround,"
+                + "you can re-open the Annotator on '{}'.\n\n".format(code)
+                + "We will now process any remaining upload queue."
+            ) from None
+        except requests.HTTPError as e:
+            if response.status_code == 401:
+                raise PlomAuthenticationException() from None
+            if response.status_code == 406:
+                if response.text == "integrity_fail":
+                    raise PlomConflict(
+                        "Integrity fail: can happen if manager altered task while you annotated"
                     ) from None
-                if response.status_code == 400:
-                    raise PlomSeriousException(response.text) from None
-                raise PlomSeriousException(f"Some other sort of error {e}") from None
+                raise PlomSeriousException(response.text) from None
+            if response.status_code == 409:
+                raise PlomTaskChangedError("Task ownership has changed.") from None
+            if response.status_code == 410:
+                raise PlomTaskDeletedError(
+                    "No such task - it has been deleted from server."
+                ) from None
+            if response.status_code == 400:
+                raise PlomSeriousException(response.text) from None
+            raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def MgetUserRubricTabs(self, question):
         """Ask server for the user's rubric-tabs config file for this question.
@@ -564,7 +499,6 @@ class Messenger(BaseMessenger):
             question or `None` if server has no saved tabs for that
             user/question pair.
         """
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 f"/MK/user/{self.user}/{question}",
@@ -591,8 +525,6 @@ class Messenger(BaseMessenger):
             raise PlomSeriousException(
                 f"Error of type {e} when creating new rubric"
             ) from None
-        finally:
-            self.SRmutex.release()
 
     def MsaveUserRubricTabs(self, question, tab_config):
         """Cache the user's rubric-tabs config for this question onto the server.
@@ -609,17 +541,17 @@ class Messenger(BaseMessenger):
         Returns:
             None
         """
-        self.SRmutex.acquire()
         try:
-            response = self.put(
-                f"/MK/user/{self.user}/{question}",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "question": question,
-                    "rubric_config": tab_config,
-                },
-            )
+            with self.SRmutex:
+                response = self.put(
+                    f"/MK/user/{self.user}/{question}",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "question": question,
+                        "rubric_config": tab_config,
+                    },
+                )
             response.raise_for_status()
 
         except requests.HTTPError as e:
@@ -628,5 +560,3 @@ class Messenger(BaseMessenger):
             raise PlomSeriousException(
                 f"Error of type {e} when creating new rubric"
             ) from None
-        finally:
-            self.SRmutex.release()
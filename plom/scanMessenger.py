@@ -39,7 +39,6 @@ class ScanMessenger(BaseMessenger):
           after network failure (for example) or uploading unknown or
           colliding pages.
         """
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/bundle",
@@ -56,8 +55,6 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
     def createNewBundle(self, bundle_name, md5sum):
         """Ask server to create bundle with given name/md5sum.
@@ -67,25 +64,23 @@ class ScanMessenger(BaseMessenger):
         * If bundle matches 'both' then return [True, skip_list] where skip_list = the page-orders from that bundle that are already in the system. The scan scripts will then skip those uploads.
         * If no such bundle return [True, []] - create the bundle and return an empty skip-list.
         """
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/bundle",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "bundle": bundle_name,
-                    "md5sum": md5sum,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/bundle",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "bundle": bundle_name,
+                        "md5sum": md5sum,
+                    },
+                )
+                response.raise_for_status()
+                return response.json()
+            except requests.HTTPError as e:
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
 
     def listBundles(self):
         """Ask server for list of bundles in database.
@@ -94,7 +89,6 @@ class ScanMessenger(BaseMessenger):
             list: a list of dict, each contains the `name`, `md5sum` and
             `numberOfPages` for each bundle.
         """
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/plom/admin/bundle/list",
@@ -105,8 +99,6 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
@@ -310,7 +302,6 @@ class ScanMessenger(BaseMessenger):
         return response.json()
 
     def getScannedTests(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/scanned",
@@ -321,13 +312,10 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getUnusedTests(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/unused",
@@ -338,13 +326,10 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getIncompleteTests(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/incomplete",
@@ -355,13 +340,10 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getCompleteHW(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/completeHW",
@@ -372,13 +354,10 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def getMissingHW(self):
-        self.SRmutex.acquire()
         try:
             response = self.get(
                 "/REP/missingHW",
@@ -389,36 +368,32 @@ class ScanMessenger(BaseMessenger):
             if response.status_code == 401:
                 raise PlomAuthenticationException() from None
             raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
 
         return response.json()
 
     def replaceMissingHWQuestion(self, student_id=None, test=None, question=None):
         # can replace by SID or by test-number
-        self.SRmutex.acquire()
-        try:
-            response = self.put(
-                "/plom/admin/missingHWQuestion",
-                json={
-                    "user": self.user,
-                    "token": self.token,
-                    "question": question,
-                    "sid": student_id,
-                    "test": test,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if response.status_code == 404:
-                raise PlomSeriousException(
-                    "Server could not find the TPV - this should not happen!"
-                ) from None
-            if response.status_code == 401:
-                raise PlomAuthenticationException() from None
-            if response.status_code == 409:  # that question already has pages
-                raise PlomTakenException() from None
-            raise PlomSeriousException(f"Some other sort of error {e}") from None
-        finally:
-            self.SRmutex.release()
+        with self.SRmutex:
+            try:
+                response = self.put(
+                    "/plom/admin/missingHWQuestion",
+                    json={
+                        "user": self.user,
+                        "token": self.token,
+                        "question": question,
+                        "sid": student_id,
+                        "test": test,
+                    },
+                )
+                response.raise_for_status()
+                return response.json()
+            except requests.HTTPError as e:
+                if response.status_code == 404:
+                    raise PlomSeriousException(
+                        "Server could not find the TPV - this should not happen!"
+                    ) from None
+                if response.status_code == 401:
+                    raise PlomAuthenticationException() from None
+                if response.status_code == 409:  # that question already has pages
+                    raise PlomTakenException() from None
+                raise PlomSeriousException(f"Some other sort of error {e}") from None
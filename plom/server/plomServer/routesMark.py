@@ -8,6 +8,7 @@
 from aiohttp import web, MultipartReader
 
 from .routeutils import authenticate_by_token, authenticate_by_token_required_fields
+from .routeutils import json_response, cacheable_json_response
 from .routeutils import validate_required_fields, log_request
 from .routeutils import write_admin
 from .routeutils import log
@@ -27,7 +28,7 @@ class MarkHandler:
     def MgetQuestionMark(self, data, request):
         """Retrieve the maximum mark for a question.
 
-        Respond with status 200/416.
+        Respond with status 200/304/416.
 
         Args:
             data (dict): Dictionary including user data
@@ -50,7 +51,10 @@ class MarkHandler:
                 reason="Question out of range - please check and try again.",
             )
         maxmark = self.server.testSpec["question"][str(question)]["mark"]
-        return web.json_response(maxmark, status=200)
+        # fixed by the spec: clients may reuse this for a while without asking
+        return cacheable_json_response(
+            request, maxmark, cache_control="private, max-age=3600"
+        )
 
     # @routes.get("/MK/progress")
     @authenticate_by_token_required_fields(["q", "v"])
@@ -76,7 +80,7 @@ class MarkHandler:
         except (ValueError, TypeError):
             raise web.HTTPBadRequest(reason="question and version must be integers")
         try:
-            return web.json_response(self.server.MprogressCount(q, v))
+            return json_response(self.server.MprogressCount(q, v))
         except ValueError as e:
             raise web.HTTPRequestRangeNotSatisfiable(reason=str(e))
 
@@ -85,7 +89,8 @@ class MarkHandler:
     def MgetDoneTasks(self, data, request):
         """Retrieve data for questions which have already been graded by the user.
 
-        Respond with status 200.
+        Respond with status 200, or 304 if the client's ``If-None-Match``
+        header matches the ETag of the list.
 
         Args:
             data (dict): Dictionary including user data in addition to
@@ -99,9 +104,8 @@ class MarkHandler:
             spent grading and list of tag-texts.
         """
         # return the completed list
-        return web.json_response(
-            self.server.MgetDoneTasks(data["user"], data["q"], data["v"]),
-            status=200,
+        return cacheable_json_response(
+            request, self.server.MgetDoneTasks(data["user"], data["q"], data["v"])
         )
 
     # @routes.get("/MK/tasks/available")
@@ -126,7 +130,7 @@ class MarkHandler:
         )
         if give is None:
             return web.Response(status=204)  # no papers left
-        return web.json_response(give)
+        return json_response(give)
 
     # @routes.post("/MK/latex")
     @authenticate_by_token_required_fields(["user", "fragment"])
@@ -148,7 +152,7 @@ class MarkHandler:
         if valid:
             return web.Response(body=value, status=200)
         r = {"error": True, "tex_output": value}
-        return web.json_response(r, status=406)
+        return json_response(r, status=406)
 
     # @routes.patch("/MK/tasks/{task}")
     @authenticate_by_token_required_fields(["user", "version"])
@@ -192,7 +196,7 @@ class MarkHandler:
             else:
                 raise web.HTTPBadRequest(reason=errmsg)
 
-        return web.json_response(retvals[1:], status=200)
+        return json_response(retvals[1:], status=200)
 
     # @routes.put("/MK/tasks/{task}")
     async def MreturnMarkedTask(self, request):
@@ -302,7 +306,7 @@ class MarkHandler:
                 raise web.HTTPBadRequest(reason=str(info))
 
         # info is tuple of Num Done tasks, Num Totalled tasks
-        return web.json_response(info, status=200)
+        return json_response(info, status=200)
 
     # @routes.get("/annotations/{number}/{question}/{edition}")
     # TODO: optionally have this integrity field?
@@ -394,7 +398,7 @@ class MarkHandler:
             else:
                 return web.Response(status=400)  # some other error
         plomdata = results[1]
-        return web.json_response(plomdata, status=200)
+        return json_response(plomdata, status=200)
 
     # @routes.get("/annotations_image/{number}/{question}/{edition}")
     @authenticate_by_token_required_fields([])
@@ -521,7 +525,7 @@ class MarkHandler:
         """
         task = request.match_info["task"]
         tag_list = self.server.DB.MgetTagsOfTask(task)
-        return web.json_response(tag_list)
+        return json_response(tag_list)
 
     # @routes.patch("/tags/{task}")
     @authenticate_by_token_required_fields(["user", "tag_text"])
@@ -597,7 +601,7 @@ class MarkHandler:
             aiohttp.web_response.Response: 200 with list of tags each encoded as (key, text)
         """
         tag_list = self.server.MgetAllTags()
-        return web.json_response(tag_list)
+        return json_response(tag_list)
 
     # @routes.patch("/tags")
     @authenticate_by_token_required_fields(["user", "tag_text"])
@@ -618,7 +622,7 @@ class MarkHandler:
             raise web.HTTPNotAcceptable(reason="Text contains disallowed characters")
         success, tag_key = self.server.McreateNewTag(data["user"], data["tag_text"])
         if success:
-            return web.json_response(tag_key)
+            return json_response(tag_key)
         else:
             raise request.HTTPConflict(reason="Tag already in system")
 
@@ -641,7 +645,7 @@ class MarkHandler:
             # TODO: wrong thing?  not conflict, badrequest
             raise web.HTTPConflict(reason=f"Not such task {task}")
         tags = tags.split()
-        return web.json_response(tags)
+        return json_response(tags)
 
     # @routes.get("/pagedata/{number}")
     @authenticate_by_token_required_fields([])
@@ -738,7 +742,7 @@ class MarkHandler:
         pages_data = []
         for row in val:
             pages_data.append({k: v for k, v in zip(rownames, row)})
-        return web.json_response(pages_data, status=200)
+        return json_response(pages_data, status=200)
 
     # @routes.get("/pagedata/{number}/{question}")
     @authenticate_by_token_required_fields([])
@@ -773,7 +777,7 @@ class MarkHandler:
         pages_data = []
         for row in val:
             pages_data.append({k: v for k, v in zip(rownames, row)})
-        return web.json_response(pages_data, status=200)
+        return json_response(pages_data, status=200)
 
     # @routes.get("/pagedata/{number}/context/{question}")
     @authenticate_by_token_required_fields([])
@@ -833,7 +837,7 @@ class MarkHandler:
         )
         if not ok:
             raise web.HTTPConflict(reason=val)
-        return web.json_response(val, status=200)
+        return json_response(val, status=200)
 
     # @routes.get("/MK/allMax")
     @authenticate_by_token
@@ -848,7 +852,7 @@ class MarkHandler:
             aiohttp.web_response.Response: A response which includes a dictionary
             for the highest mark possible for each question of the exam.
         """
-        return web.json_response(self.server.MgetAllMax(), status=200)
+        return json_response(self.server.MgetAllMax(), status=200)
 
     # @routes.patch("/MK/review")
     @authenticate_by_token_required_fields(["paper_number", "question"])
@@ -7,6 +7,7 @@ from aiohttp import web
 
 from .routeutils import authenticate_by_token, authenticate_by_token_required_fields
 from .routeutils import validate_required_fields, log_request
+from .routeutils import cacheable_json_response
 from .routeutils import log
 
 
@@ -125,12 +126,13 @@ class RubricHandler:
             request (aiohttp.web_request.Request): A request of type GET /MK/rubric.
 
         Returns:
-            aiohttp.web_response.Response: List of all comments in DB
+            aiohttp.web_response.Response: List of all comments in DB,
+            with an ETag: a 304 if the client's copy is still current.
         """
         username = data["user"]
 
         rubrics = self.server.MgetRubrics()
-        return web.json_response(rubrics, status=200)
+        return cacheable_json_response(request, rubrics)
 
     # @routes.get("/MK/rubric/{question}")
     @authenticate_by_token_required_fields(["user"])
@@ -142,13 +144,14 @@ class RubricHandler:
             request (aiohttp.web_request.Request): A request of type GET /MK/rubric/{question}.
 
         Returns:
-            aiohttp.web_response.Response: List of all comments in DB
+            aiohttp.web_response.Response: List of all comments in DB,
+            with an ETag: a 304 if the client's copy is still current.
         """
         username = data["user"]
         question = request.match_info["question"]
 
         rubrics = self.server.MgetRubrics(question)
-        return web.json_response(rubrics, status=200)
+        return cacheable_json_response(request, rubrics)
 
     # @routes.patch("/MK/rubric/{key}")
     @authenticate_by_token_required_fields(["user", "rubric"])
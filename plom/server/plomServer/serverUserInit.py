@@ -5,19 +5,31 @@
 # Copyright (C) 2022 Edith Coates
 
 import logging
+import time
 
 log = logging.getLogger("servUI")
 
 confdir = "serverConfiguration"
 
+# How long (in seconds) a successfully validated token is remembered
+# before we check it against the database again.
+token_cache_lifetime = 30
+
 
 def validate(self, user, token):
     """Check the user's token is valid.
 
+    Recently validated tokens are remembered for a short while to avoid
+    hitting the database on every request.  Anything here that changes
+    a user's token must call :func:`forget_validated_token`.
+
     Returns:
         bool
     """
     # log.debug(f'Validating user "{user}"')
+    cached = self._validated_tokens.get(user)
+    if cached and cached[0] == token and time.monotonic() < cached[1]:
+        return True
     try:
         dbToken = self.DB.getUserToken(user)
     except ValueError:
@@ -34,9 +46,19 @@ def validate(self, user, token):
         )
     elif not r:
         log.info(f'User "{user}" tried to use a stale or invalid token')
+    if r:
+        self._validated_tokens[user] = (
+            token,
+            time.monotonic() + token_cache_lifetime,
+        )
     return bool(r)
 
 
+def forget_validated_token(self, user):
+    """Drop any remembered token for this user, e.g., when it is revoked."""
+    self._validated_tokens.pop(user, None)
+
+
 def InfoShortName(self):
     if self.testSpec is None:
         return None
@@ -118,6 +140,7 @@ def giveUserToken(self, user, password, clientAPI, client_ver, remote_ip):
         )
     # give user a token, and store the xor'd version.
     [clientToken, storageToken] = self.authority.create_token()
+    self.forget_validated_token(user)
     self.DB.setUserToken(user, storageToken)
     # On token request also make sure anything "out" with that user is reset as todo.
     # We keep this here in case of client crash - todo's get reset on login and logout.
@@ -134,6 +157,7 @@ def setUserEnable(self, user, enableFlag):
     if enableFlag:
         self.DB.enableUser(user)
     else:
+        self.forget_validated_token(user)
         self.DB.disableUser(user)
     return [True]
 
@@ -176,6 +200,7 @@ def changeUserPassword(self, username, password):
 def closeUser(self, user):
     """Client is closing down their app, so remove the authorisation token"""
     log.info("Revoking auth token from user {}".format(user))
+    self.forget_validated_token(user)
     self.DB.clearUserToken(user)
     # make sure all their out tasks are returned to "todo"
     self.DB.resetUsersToDo(user)
@@ -59,6 +59,8 @@ class Server:
             log.info("no spec file: we expect it later...")
         self.authority = Authority(masterToken)
         self.DB = db
+        # user -> (token, expiry): see validate()
+        self._validated_tokens = {}
         self.API = serverAPI
         self.Version = __version__
         # TODO: is leaky to have this token in the log/stdout?
@@ -106,6 +108,7 @@ class Server:
 
     from .plomServer.serverUserInit import (
         validate,
+        forget_validated_token,
         checkPassword,
         checkUserEnabled,
         createUser,
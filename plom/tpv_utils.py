@@ -69,6 +69,11 @@ with the orientation code being similar to that used for the TPV
 
 import random
 
+# lengths of the various codes, computed once rather than on every call
+_TPV_LEN = len("TTTTTPPPVVVOCCCCC")
+_PPV_LEN = len("TTTTTPPPVVV")
+_EXTRA_PAGE_LEN = len("plomX9")
+
 
 def isValidTPV(tpv):
     """Is this a valid TPV code?
@@ -78,7 +83,7 @@ def isValidTPV(tpv):
     """
     # string prefix is needed for pyzbar but not zxingcpp
     tpv = tpv.lstrip("QR-Code:")
-    if len(tpv) != len("TTTTTPPPVVVOCCCCC"):  # todo = remove in future.
+    if len(tpv) != _TPV_LEN:  # todo = remove in future.
         return False
     return tpv.isnumeric()
 
@@ -91,7 +96,7 @@ def isValidExtraPage(tpv):
     """
     # string prefix is needed for pyzbar but not zxingcpp
     tpv = tpv.lstrip("QR-Code:")
-    if len(tpv) != len("plomX9"):  # todo = remove in future.
+    if len(tpv) != _EXTRA_PAGE_LEN:  # todo = remove in future.
         return False
     if (tpv[:5] == "plomX") and tpv[5].isnumeric():
         return True
@@ -181,7 +186,7 @@ def parse_paper_page_version(ppv_key):
        pn (int): page group number, up to 3 digits
        vn (int): version number, up to 3 digits
     """
-    assert len(ppv_key) == len("TTTTTPPPVVV")
+    assert len(ppv_key) == _PPV_LEN
     return (
         int(ppv_key[:5]),
         int(ppv_key[5:8]),
@@ -4,42 +4,85 @@
 # Copyright (C) 2023 Edith Coates
 # Copyright (C) 2023 Natalie Balashov
 
-from collections import defaultdict
-import csv
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
 from pathlib import Path
+import re
 import tempfile
-from typing import List, Dict
+from typing import List, Dict, TYPE_CHECKING
 from dataclasses import asdict
 
-import fitz
-
 from django.core.management import call_command
 from django.conf import settings
 
 from plom import SpecVerifier
-from plom.create.mergeAndCodePages import create_QR_codes
-from plom.create.scribble_utils import scribble_name_and_id, scribble_pages
 from Papers.services import SpecificationService
+from Preparation.services import (
+    ExtraPageService,
+    PrenameSettingService,
+    ScrapPaperService,
+    StagingStudentService,
+)
+
+# PyMuPDF and the scribble/QR-code tools are only needed when actually
+# building bundles, so they are imported lazily inside the methods below
+# rather than on every management command that loads the Demo app.
+if TYPE_CHECKING:
+    import fitz
+
+# Scribbling is CPU-bound and independent per paper, so farm it out to a
+# pool of worker processes.  The pool is created on first use and reused.
+_scribble_workers = os.cpu_count() or 1
+_scribble_pool = None
+
+
+def _get_scribble_pool() -> ProcessPoolExecutor:
+    global _scribble_pool
+    if _scribble_pool is None:
+        _scribble_pool = ProcessPoolExecutor(max_workers=_scribble_workers)
+    return _scribble_pool
+
+
+# prenamed papers are "exam_XXXX_YYYYYYY" and normal are "exam_XXXX"
+_paper_filename_re = re.compile(r"^exam_(\d+)(?:_([^_]+))?$")
+
+
+# Where to stamp info on extra pages and scrap paper
+# TODO - make these numbers less magical
+_stamp_box = (25, 400, 500, 600)
+_stamp_font = None
+
+
+def _get_stamp_font() -> "fitz.Font":
+    global _stamp_font
+    if _stamp_font is None:
+        import fitz
+
+        _stamp_font = fitz.Font("helv")
+    return _stamp_font
 
 
 class DemoBundleService:
     """Handle generating demo bundles."""
 
     def get_classlist_as_dict(self):
-        with tempfile.TemporaryDirectory() as td:
-            classlist_file = Path(td) / "classlist.csv"
-            classlist = []
-            call_command("plom_preparation_classlist", "download", f"{classlist_file}")
-            with open(classlist_file) as fh:
-                red = csv.DictReader(fh, skipinitialspace=True)
-                for row in red:
-                    classlist.append(
-                        {
-                            "id": row["id"],
-                            "name": row["name"],
-                            "paper_number": row["paper_number"],
-                        }
-                    )
+        # paper_number is only meaningful when prenaming, else -1 as in the csv
+        prename = PrenameSettingService().get_prenaming_setting()
+        classlist = []
+        for row in StagingStudentService().get_students():
+            if prename and row["paper_number"]:
+                paper_number = str(row["paper_number"])
+            else:
+                paper_number = "-1"
+            classlist.append(
+                {
+                    "id": row["student_id"],
+                    "name": row["student_name"],
+                    "paper_number": paper_number,
+                }
+            )
         return classlist
 
     def get_default_paper_length(self):
@@ -53,6 +96,8 @@ class DemoBundleService:
             out_file (path.Path): path to the monolithic scribble PDF
             config (PlomServerConfig): server config
         """
+        import fitz
+
         bundles = config.bundles
         default_n_pages = self.get_default_paper_length()
 
@@ -85,7 +130,9 @@ class DemoBundleService:
                 )
                 if paper == curr_bundle["last_paper"]:
                     bundle_filename = out_file.stem + f"{curr_bundle_idx + 1}.pdf"
-                    bundle_doc.save(out_file.with_name(bundle_filename))
+                    bundle_doc.save(
+                        out_file.with_name(bundle_filename), garbage=3, deflate=True
+                    )
                     bundle_doc.close()
                     curr_bundle_idx += 1
 
@@ -94,32 +141,33 @@ class DemoBundleService:
 
     def get_extra_page(self) -> None:
         # Assumes that the extra page has been generated
-        call_command(
-            "plom_preparation_extrapage",
-            "download",
-            settings.MEDIA_ROOT / "papersToPrint/extra_page.pdf",
-        )
+        dest = settings.MEDIA_ROOT / "papersToPrint/extra_page.pdf"
+        dest.write_bytes(ExtraPageService().get_extra_page_pdf_as_bytes())
 
     def get_scrap_paper(self) -> None:
         # Assumes that the scrap paper has been generated
-        call_command(
-            "plom_preparation_scrap_paper",
-            "download",
-            settings.MEDIA_ROOT / "papersToPrint/scrap_paper.pdf",
-        )
+        dest = settings.MEDIA_ROOT / "papersToPrint/scrap_paper.pdf"
+        dest.write_bytes(ScrapPaperService().get_scrap_paper_pdf_as_bytes())
 
     def assign_students_to_papers(self, paper_list, classlist) -> List[Dict]:
-        # prenamed papers are "exam_XXXX_YYYYYYY" and normal are "exam_XXXX"
-        all_sid = [row["id"] for row in classlist]
-        id_to_name = {X["id"]: X["name"] for X in classlist}
+        # (path, paper_number, sid or None if not prenamed)
+        parsed_papers = [
+            (path, *_paper_filename_re.match(path.stem).groups()) for path in paper_list
+        ]
+        prenamed_sids = {sid for _, _, sid in parsed_papers if sid is not None}
+        # a single pass over the classlist gets the names and the students
+        # not used by prenamed papers, in classlist order
+        id_to_name = {}
+        unassigned_sids = deque()
+        for row in classlist:
+            id_to_name[row["id"]] = row["name"]
+            if row["id"] not in prenamed_sids:
+                unassigned_sids.append(row["id"])
 
         assignment = []
 
-        for path in paper_list:
-            paper_number = path.stem.split("_")[1]
-            if len(path.stem.split("_")) == 3:  # paper is prenamed
-                sid = path.stem.split("_")[2]
-                all_sid.remove(sid)
+        for path, paper_number, sid in parsed_papers:
+            if sid is not None:  # paper is prenamed
                 assignment.append(
                     {
                         "path": path,
@@ -130,7 +178,7 @@ class DemoBundleService:
                     }
                 )
             else:
-                sid = all_sid.pop(0)
+                sid = unassigned_sids.popleft()
 
                 assignment.append(
                     {
@@ -145,7 +193,7 @@ class DemoBundleService:
         return assignment
 
     def make_last_page_with_wrong_version(
-        self, pdf_doc: fitz.Document, paper_number: int
+        self, pdf_doc: "fitz.Document", paper_number: int
     ) -> None:
         """Muck around with the last page for testing purposes.
 
@@ -160,6 +208,10 @@ class DemoBundleService:
         Returns:
             None, but modifies ``pdf_doc``  as a side effect.
         """
+        import fitz
+
+        from plom.create.mergeAndCodePages import create_QR_codes
+
         # a rather cludge way to get at the spec via commandline tools
         # really we just need the public code.
         with tempfile.TemporaryDirectory() as td:
@@ -190,6 +242,8 @@ class DemoBundleService:
             pdf_doc[-1].insert_image(rect, pixmap=fitz.Pixmap(qr_pngs[1]), overlay=True)
 
     def append_extra_page(self, pdf_doc, paper_number, student_id, extra_page_path):
+        import fitz
+
         with fitz.open(extra_page_path) as extra_pages_pdf:
             pdf_doc.insert_pdf(
                 extra_pages_pdf,
@@ -200,21 +254,25 @@ class DemoBundleService:
             page_rect = pdf_doc[-1].rect
             # stamp some info on it - TODO - make this look better.
             tw = fitz.TextWriter(page_rect, color=(0, 0, 1))
-            # TODO - make these numbers less magical
-            maxbox = fitz.Rect(25, 400, 500, 600)
+            maxbox = fitz.Rect(_stamp_box)
             # page.draw_rect(maxbox, color=(1, 0, 0))
             excess = tw.fill_textbox(
                 maxbox,
                 f"EXTRA PAGE - t{paper_number} Q1 - {student_id}",
                 align=fitz.TEXT_ALIGN_LEFT,
                 fontsize=18,
-                font=fitz.Font("helv"),
+                font=_get_stamp_font(),
             )
-            assert not excess, "Text didn't fit: is extra-page text too long?"
+            if excess:
+                raise RuntimeError(
+                    f"Text didn't fit on extra page for t{paper_number}: too long?"
+                )
             tw.write_text(pdf_doc[-1])
             tw.write_text(pdf_doc[-2])
 
     def append_scrap_page(self, pdf_doc, paper_number, student_id, scrap_paper_path):
+        import fitz
+
         with fitz.open(scrap_paper_path) as scrap_paper_pdf:
             pdf_doc.insert_pdf(
                 scrap_paper_pdf,
@@ -225,26 +283,31 @@ class DemoBundleService:
             page_rect = pdf_doc[-1].rect
             # stamp some info on it - TODO - make this look better.
             tw = fitz.TextWriter(page_rect, color=(0, 0, 1))
-            # TODO - make these numbers less magical
-            maxbox = fitz.Rect(25, 400, 500, 600)
+            maxbox = fitz.Rect(_stamp_box)
             # page.draw_rect(maxbox, color=(1, 0, 0))
             excess = tw.fill_textbox(
                 maxbox,
                 f"SCRAP PAPER DNM - t{paper_number} - {student_id}",
                 align=fitz.TEXT_ALIGN_LEFT,
                 fontsize=18,
-                font=fitz.Font("helv"),
+                font=_get_stamp_font(),
             )
-            assert not excess, "Text didn't fit: is scrap-paper text too long?"
+            if excess:
+                raise RuntimeError(
+                    f"Text didn't fit on scrap paper for t{paper_number}: too long?"
+                )
             tw.write_text(pdf_doc[-1])
             tw.write_text(pdf_doc[-2])
 
-    def append_duplicate_page(self, pdf_doc: fitz.Document, page_number: int) -> None:
+    def append_duplicate_page(self, pdf_doc: "fitz.Document", page_number: int) -> None:
         last_page = len(pdf_doc) - 1
+        # Note: not the cheaper ``copy_page``, which would only reference the
+        # same page object: we scribble on the pages afterwards, and both
+        # "copies" would then get both sets of scribbles.
         pdf_doc.fullcopy_page(last_page)
 
     def insert_qr_from_previous_page(
-        self, pdf_doc: fitz.Document, paper_number: int
+        self, pdf_doc: "fitz.Document", paper_number: int
     ) -> None:
         """Muck around with the penultimate page for testing purposes.
 
@@ -259,6 +322,10 @@ class DemoBundleService:
         Returns:
             None, but modifies ``pdf_doc`` as a side effect.
         """
+        import fitz
+
+        from plom.create.mergeAndCodePages import create_QR_codes
+
         # a rather cludge way to get at the spec via commandline tools
         # really we just need the public code.
         with tempfile.TemporaryDirectory() as td:
@@ -286,6 +353,10 @@ class DemoBundleService:
         )
 
     def insert_page_from_another_assessment(self, pdf_doc):
+        import fitz
+
+        from plom.create.mergeAndCodePages import create_QR_codes
+
         # a rather cludge way to get at the spec via commandline tools
         # really we just need the public code.
         with tempfile.TemporaryDirectory() as td:
@@ -315,6 +386,10 @@ class DemoBundleService:
 
     def append_out_of_range_paper_and_page(self, pdf_doc):
         """Append two new pages to the pdf - one as test-1 page-999 and one as test-99999 page-1."""
+        import fitz
+
+        from plom.create.mergeAndCodePages import create_QR_codes
+
         # a rather cludge way to get at the spec via commandline tools
         # really we just need the public code.
         with tempfile.TemporaryDirectory() as td:
@@ -369,12 +444,12 @@ class DemoBundleService:
         scrap_paper_path,
         out_file,
         *,
-        extra_page_papers=[],
-        scrap_page_papers=[],
-        garbage_page_papers=[],
-        duplicate_pages=[],
-        duplicate_qr=[],
-        wrong_version=[],
+        extra_page_papers=(),
+        scrap_page_papers=(),
+        garbage_page_papers=(),
+        duplicate_pages=(),
+        duplicate_qr=(),
+        wrong_version=(),
     ):
         # extra_page_papers = list of paper_numbers to which we append a couple of extra_pages
         # scrap_page_papers = list of paper_numbers to which we append a couple of scrap-paper pages
@@ -382,13 +457,27 @@ class DemoBundleService:
         # duplicate_pages = a list of papers to have their final page duplicated.
         # wrong_version = list of paper_numbers to which we replace last page with a blank but wrong version number.
 
-        # A complete collection of the pdfs created
-        with fitz.open() as all_pdf_documents:
+        import fitz
+
+        from plom.create.scribble_utils import scribble_pdf_bytes
+
+        # we check each paper against these, so make the lookups O(1)
+        extra_page_papers = frozenset(extra_page_papers)
+        scrap_page_papers = frozenset(scrap_page_papers)
+        garbage_page_papers = frozenset(garbage_page_papers)
+        duplicate_pages = frozenset(duplicate_pages)
+        duplicate_qr = frozenset(duplicate_qr)
+        wrong_version = frozenset(wrong_version)
+
+        def scribbled_papers():
+            # Make the pre-scribble changes to each paper (these may hit the
+            # database) and hand it off to the pool for scribbling.  Only keep
+            # a few papers in flight: once the pool is saturated, wait for the
+            # oldest before submitting another.  Yields the scribbled papers
+            # in order.
+            scribbling = deque()
             for paper in assigned_papers_ids:
                 with fitz.open(paper["path"]) as pdf_document:
-                    # first put an ID on paper if it is not prenamed.
-                    if not paper["prenamed"]:
-                        scribble_name_and_id(pdf_document, paper["id"], paper["name"])
                     paper_number = int(paper["paper_number"])
 
                     if paper_number in wrong_version:
@@ -413,23 +502,73 @@ class DemoBundleService:
                     if paper_number in duplicate_pages:
                         self.append_duplicate_page(pdf_document, duplicate_pages)
 
-                    # scribble on the pages
-                    scribble_pages(pdf_document)
-
-                    # insert a qr-code from a previous page after scribbling
-                    if paper_number in duplicate_qr:
-                        self.insert_qr_from_previous_page(pdf_document, paper_number)
-
-                    # append a garbage page after the scribbling
-                    if paper_number in garbage_page_papers:
-                        self.append_garbage_page(pdf_document)
-
-                    # TODO: Append out-of-range papers and wrong public codes to some bundles
-
-                    # finally, append this to the bundle
-                    all_pdf_documents.insert_pdf(pdf_document)
+                    # put an ID on paper if it is not prenamed, and scribble on the pages
+                    if paper["prenamed"]:
+                        student_number, student_name = None, None
+                    else:
+                        student_number, student_name = paper["id"], paper["name"]
+                    future = _get_scribble_pool().submit(
+                        scribble_pdf_bytes,
+                        pdf_document.tobytes(),
+                        student_number=student_number,
+                        student_name=student_name,
+                    )
+                scribbling.append((paper_number, future))
+                if len(scribbling) >= max_in_flight:
+                    paper_number, future = scribbling.popleft()
+                    yield paper_number, future.result()
+            while scribbling:
+                paper_number, future = scribbling.popleft()
+                yield paper_number, future.result()
+
+        def merge_scribbled(batch, paper_number, pdf_bytes):
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+                # insert a qr-code from a previous page after scribbling
+                if paper_number in duplicate_qr:
+                    self.insert_qr_from_previous_page(pdf_document, paper_number)
+
+                # append a garbage page after the scribbling
+                if paper_number in garbage_page_papers:
+                    self.append_garbage_page(pdf_document)
+
+                # TODO: Append out-of-range papers and wrong public codes to some bundles
+
+                # finally, append this to the bundle
+                batch.insert_pdf(pdf_document)
+
+        def write_batch(batch, first):
+            if first:
+                batch.save(out_file, garbage=3, deflate=True)
+                return
+            # Append to what is already on disk with an incremental save: only
+            # the new objects get written and the earlier papers stay on disk.
+            with fitz.open(out_file) as bundle:
+                bundle.insert_pdf(batch)
+                bundle.save(
+                    bundle.name,
+                    incremental=True,
+                    encryption=fitz.PDF_ENCRYPT_KEEP,
+                    deflate=True,
+                )
 
-            all_pdf_documents.save(out_file)
+        # Merge the papers into the bundle a batch at a time and write each
+        # batch out, so memory is bounded by the pool size rather than by the
+        # size of the bundle.
+        max_in_flight = 2 * _scribble_workers
+        first_batch = True
+        batch = fitz.open()
+        try:
+            for n, (paper_number, pdf_bytes) in enumerate(scribbled_papers(), 1):
+                merge_scribbled(batch, paper_number, pdf_bytes)
+                if n % max_in_flight == 0:
+                    write_batch(batch, first_batch)
+                    first_batch = False
+                    batch.close()
+                    batch = fitz.open()
+            if first_batch or batch.page_count:
+                write_batch(batch, first_batch)
+        finally:
+            batch.close()
 
     def _flatten(self, list_to_flatten):
         flat_list = []
@@ -448,14 +587,16 @@ class DemoBundleService:
         classlist = self.get_classlist_as_dict()
         classlist_length = len(classlist)
         papers_to_print = settings.MEDIA_ROOT / "papersToPrint"
-        paper_list = [paper for paper in papers_to_print.glob("exam*.pdf")]
         self.get_extra_page()  # download copy of the extra-page pdf to papersToPrint subdirectory
         extra_page_path = papers_to_print / "extra_page.pdf"
         self.get_scrap_paper()  # download copy of the scrap_paper pdf to papersToPrint subdirectory
         scrap_paper_path = papers_to_print / "scrap_paper.pdf"
 
         number_papers_to_use = classlist_length
-        papers_to_use = sorted(paper_list)[:number_papers_to_use]
+        # only the first few papers are needed: no need to sort them all
+        papers_to_use = heapq.nsmallest(
+            number_papers_to_use, papers_to_print.glob("exam*.pdf")
+        )
 
         assigned_papers_ids = self.assign_students_to_papers(papers_to_use, classlist)
         number_prenamed = sum(1 for X in assigned_papers_ids if X["prenamed"])
@@ -3,7 +3,6 @@
 # Copyright (C) 2023 Colin B. Macdonald
 # Copyright (C) 2023 Edith Coates
 
-import fitz
 from pathlib import Path
 from time import sleep
 
@@ -14,6 +13,8 @@ class DemoHWBundleService:
     """Handle creating homework bundles in the demo."""
 
     def make_hw_bundle(self, bundle: dict):
+        import fitz
+
         paper_number = bundle["paper_number"]
         question_list = bundle["pages"]
 
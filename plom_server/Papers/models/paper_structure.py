@@ -78,6 +78,20 @@ class FixedPage(PolymorphicModel):
     page_number = models.PositiveIntegerField(null=False)
     version = models.PositiveIntegerField(null=False)
 
+    class Meta:
+        indexes = [
+            # pages are very often looked up by paper and page number
+            models.Index(fields=["paper", "page_number"]),
+            # the scan-progress queries look for unscanned pages of papers;
+            # a partial index keeps that small.  Note image (a foreign key)
+            # is already indexed by itself.
+            models.Index(
+                fields=["paper"],
+                condition=models.Q(image__isnull=True),
+                name="fixedpage_unscanned_idx",
+            ),
+        ]
+
 
 class DNMPage(FixedPage):
     """Table to store information about the do-not-mark pages.
@@ -4,7 +4,7 @@
 # Copyright (C) 2023 Colin B. Macdonald
 
 import logging
-from typing import List
+from typing import Dict, Iterable, List, Tuple
 
 from django.db import transaction
 
@@ -59,6 +59,29 @@ class PaperInfoService:
             )
         return page.version
 
+    @transaction.atomic
+    def get_page_versions(
+        self, paper_numbers: Iterable[int]
+    ) -> Dict[Tuple[int, int], int]:
+        """Return the versions of all the fixed pages of the given papers.
+
+        Args:
+            paper_numbers: which papers to look up.  Papers not in the
+                database are silently omitted.
+
+        Returns:
+            A dict keyed by ``(paper_number, page_number)`` pairs, whose
+            values are the versions of those pages.  This is one database
+            query, so prefer it to repeated calls of
+            :meth:`get_version_from_paper_page`.
+        """
+        return {
+            (paper_number, page_number): version
+            for paper_number, page_number, version in FixedPage.objects.filter(
+                paper__paper_number__in=paper_numbers
+            ).values_list("paper__paper_number", "page_number", "version")
+        }
+
     @transaction.atomic
     def get_version_from_paper_question(self, paper_number, question_number) -> int:
         """Given a paper_number and question_number, return the version of that question."""
@@ -0,0 +1,39 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 agent
+
+from django.test import TestCase
+from model_bakery import baker
+
+from ..services import PaperInfoService
+from ..models import Paper, FixedPage
+
+
+class PaperInfoTests(TestCase):
+    """Tests for services.PaperInfoService."""
+
+    def setUp(self):
+        for paper_number in [1, 2, 3]:
+            paper = baker.make(Paper, paper_number=paper_number)
+            for pg in range(1, 4):
+                baker.make(
+                    FixedPage,
+                    paper=paper,
+                    page_number=pg,
+                    version=(paper_number + pg) % 2 + 1,
+                )
+        return super().setUp()
+
+    def test_get_page_versions(self):
+        pis = PaperInfoService()
+        versions = pis.get_page_versions([1, 3, 17])
+        self.assertEqual(len(versions), 6)
+        for paper_number in [1, 3]:
+            for pg in range(1, 4):
+                self.assertEqual(
+                    versions[(paper_number, pg)],
+                    pis.get_version_from_paper_page(paper_number, pg),
+                )
+        self.assertNotIn((2, 1), versions)
+
+    def test_get_page_versions_empty(self):
+        self.assertEqual(PaperInfoService().get_page_versions([]), {})
@@ -23,9 +23,7 @@ class StagingClasslistCSVService:
     def take_classlist_from_upload(self, in_memory_file):
         from plom.create.classlistValidator import PlomClasslistValidator
 
-        # delete any old classlists
-        self.delete_classlist_csv()
-        # now save the in-memory file to a tempfile and validate
+        # save the in-memory file to a tempfile and validate
         tmp_csv = Path(NamedTemporaryFile(delete=False).name)
         with open(tmp_csv, "wb") as fh:
             for chunk in in_memory_file:
@@ -36,7 +34,9 @@ class StagingClasslistCSVService:
 
         tmp_csv.unlink()
 
+        # replace any old classlist in a single transaction
         with transaction.atomic():
+            self._delete_classlist_csv()
             dj_file = File(in_memory_file, name="classlist.csv")
             cl_obj = StagingClasslistCSV(
                 valid=success, csv_file=dj_file, warnings_errors_list=werr
@@ -55,6 +55,9 @@ class StagingClasslistCSVService:
 
     @transaction.atomic()
     def delete_classlist_csv(self):
+        self._delete_classlist_csv()
+
+    def _delete_classlist_csv(self):
         # explicitly delete the file, since it is not done automagically by django
         # TODO - make this a bit cleaner.
         if StagingClasslistCSV.objects.exists():
@@ -137,14 +140,23 @@ class StagingStudentService:
         scsv = StagingClasslistCSVService()
         classlist_csv = scsv.get_classlist_csv_filepath()
         with open(classlist_csv) as fh:
-            csv_reader = csv.DictReader(fh, skipinitialspace=True)
+            csv_reader = csv.reader(fh, skipinitialspace=True)
             # make sure headers are lowercase
-            old_headers = csv_reader.fieldnames
+            headers = [x.lower() for x in next(csv_reader)]
             # since this has been validated we know it has 'id', 'name', 'paper_number'
-            csv_reader.fieldnames = [x.lower() for x in old_headers]
-            # now we have lower case field names
-            for row in csv_reader:
-                self.add_student(row["id"], row["name"], row["paper_number"])
+            id_col = headers.index("id")
+            name_col = headers.index("name")
+            pn_col = headers.index("paper_number")
+            # will raise an integrity error if ids not unique
+            StagingStudent.objects.bulk_create(
+                StagingStudent(
+                    student_id=row[id_col],
+                    student_name=row[name_col],
+                    paper_number=row[pn_col] if row[pn_col] else None,
+                )
+                for row in csv_reader
+                if row  # like DictReader, skip blank lines
+            )
         # after used make sure the csv is deleted
         scsv.delete_classlist_csv()
 
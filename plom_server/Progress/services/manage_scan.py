@@ -10,7 +10,7 @@ from typing import List, Dict, Any
 import arrow
 
 from django.db import transaction
-from django.db.models import Exists, OuterRef, Prefetch
+from django.db.models import Count, Exists, OuterRef, Q
 
 from Papers.models import (
     FixedPage,
@@ -52,7 +52,6 @@ class ManageScanService:
         """Return the total number of test-papers in the exam."""
         return Paper.objects.all().count()
 
-    @transaction.atomic
     def get_number_completed_test_papers(self):
         """Return a dict of completed papers and their fixed/mobile pages.
 
@@ -61,8 +60,7 @@ class ManageScanService:
         """
         # Get fixed pages with no image
         fixed_with_no_scan = FixedPage.objects.filter(paper=OuterRef("pk"), image=None)
-        # Get papers without fixed-page-with-no-scan
-        all_fixed_present = Paper.objects.filter(~Exists(fixed_with_no_scan))
+        # Papers without fixed-page-with-no-scan have all fixed pages present
         # now get papers with **no** fixed page scans
         fixed_with_scan = FixedPage.objects.filter(
             paper=OuterRef("pk"), image__isnull=False
@@ -73,10 +71,7 @@ class ManageScanService:
         # to avoid duplications since "exists" stops the query as soon
         # as one item is found - see below
         mobile_pages = MobilePage.objects.filter(paper=OuterRef("pk"))
-        no_fixed_but_some_mobile = Paper.objects.filter(
-            ~Exists(fixed_with_scan), Exists(mobile_pages)
-        )
-        # We can also do the above query as:
+        # We could also find papers with no fixed pages but some mobile pages as:
         #
         # no_fixed_but_some_mobile = Paper.objects.filter(
         # ~Exists(fixed_with_scan), mobilepages_set__isnull=False
@@ -86,7 +81,15 @@ class ManageScanService:
         # one needs to append the 'distinct'. This is a common problem
         # when querying backwards across foreign key fields
 
-        return all_fixed_present.count() + no_fixed_but_some_mobile.count()
+        # Count both kinds of complete paper in a single query using
+        # conditional aggregation, rather than two separate counts.
+        counts = Paper.objects.aggregate(
+            all_fixed_present=Count("pk", filter=~Exists(fixed_with_no_scan)),
+            no_fixed_but_some_mobile=Count(
+                "pk", filter=Q(~Exists(fixed_with_scan), Exists(mobile_pages))
+            ),
+        )
+        return counts["all_fixed_present"] + counts["no_fixed_but_some_mobile"]
 
     @transaction.atomic
     def get_all_completed_test_papers(self):
@@ -98,28 +101,7 @@ class ManageScanService:
         # Subquery of fixed pages with no image
         fixed_with_no_scan = FixedPage.objects.filter(paper=OuterRef("pk"), image=None)
         # Get all papers without fixed-page-with-no-scan
-        all_fixed_present = Paper.objects.filter(
-            ~Exists(fixed_with_no_scan)
-        ).prefetch_related(
-            Prefetch(
-                "fixedpage_set", queryset=FixedPage.objects.order_by("page_number")
-            ),
-            Prefetch(
-                "mobilepage_set",
-                queryset=MobilePage.objects.order_by("question_number"),
-            ),
-            "fixedpage_set__image",
-            "mobilepage_set__image",
-        )
-        # Notice all the prefetching here - this is to avoid N+1
-        # problems.  Below we loop over these papers and their pages /
-        # images we tell django to prefetch the fixed and mobile
-        # pages, and the images in the fixed and mobile pages.  Since
-        # there are many fixed/mobile pages for a given paper, these
-        # are fixedpage_set and mobilepage_set. Now because we want to
-        # loop over the fixed/mobile pages in specific orders we use
-        # the Prefetch object to specify that order at the time of
-        # prefetching.
+        all_fixed_present = Paper.objects.filter(~Exists(fixed_with_no_scan))
 
         # now subquery papers with **no** fixed page scans
         fixed_with_scan = FixedPage.objects.filter(
@@ -131,46 +113,49 @@ class ManageScanService:
         mobile_pages = MobilePage.objects.filter(paper=OuterRef("pk"))
         no_fixed_but_some_mobile = Paper.objects.filter(
             ~Exists(fixed_with_scan), Exists(mobile_pages)
-        ).prefetch_related(
-            Prefetch(
-                "mobilepage_set",
-                queryset=MobilePage.objects.order_by("question_number"),
-            ),
-            "mobilepage_set__image",
         )
-        # again since we loop over the mobile pages within the paper
-        # in a specified order, and ref the image in those mobile-pages
-        # we do all this prefetching.
 
         complete = {}
-        for paper in all_fixed_present:
-            complete[paper.paper_number] = {"fixed": [], "mobile": []}
-            # notice we don't specify order or prefetch in the loops
-            # below here because we did the hard work above
-            for fp in paper.fixedpage_set.all():
-                complete[paper.paper_number]["fixed"].append(
-                    {
-                        "page_number": fp.page_number,
-                        "img_pk": fp.image.pk,
-                    }
-                )
-            for mp in paper.mobilepage_set.all():
-                complete[paper.paper_number]["mobile"].append(
-                    {
-                        "question_number": mp.question_number,
-                        "img_pk": mp.image.pk,
-                    }
-                )
-        for paper in no_fixed_but_some_mobile:
-            complete[paper.paper_number] = {"fixed": [], "mobile": []}
-            # again we don't specify order or prefetch here because of the work above
-            for mp in paper.mobilepage_set.all():
-                complete[paper.paper_number]["mobile"].append(
-                    {
-                        "question_number": mp.question_number,
-                        "img_pk": mp.image.pk,
-                    }
-                )
+        for paper_number in all_fixed_present.values_list("paper_number", flat=True):
+            complete[paper_number] = {"fixed": [], "mobile": []}
+        for paper_number in no_fixed_but_some_mobile.values_list(
+            "paper_number", flat=True
+        ):
+            complete[paper_number] = {"fixed": [], "mobile": []}
+
+        # We only need a few columns of the pages, so rather than
+        # prefetching (and building) all the page and image objects,
+        # pull out just those columns as tuples.  The ordering ensures
+        # the pages within each paper are appended in order.  Note that
+        # image_id is the foreign key itself, so no join with the
+        # image table is needed.  We stream the rows with iterator() so
+        # they are not also cached in the queryset.
+        fixed_pages = (
+            FixedPage.objects.filter(paper__in=all_fixed_present)
+            .order_by("page_number")
+            .values_list("paper__paper_number", "page_number", "image_id")
+        )
+        for paper_number, page_number, img_pk in fixed_pages.iterator():
+            complete[paper_number]["fixed"].append(
+                {
+                    "page_number": page_number,
+                    "img_pk": img_pk,
+                }
+            )
+        mobile_pages = (
+            MobilePage.objects.filter(
+                Q(paper__in=all_fixed_present) | Q(paper__in=no_fixed_but_some_mobile)
+            )
+            .order_by("question_number")
+            .values_list("paper__paper_number", "question_number", "image_id")
+        )
+        for paper_number, question_number, img_pk in mobile_pages.iterator():
+            complete[paper_number]["mobile"].append(
+                {
+                    "question_number": question_number,
+                    "img_pk": img_pk,
+                }
+            )
         return complete
 
     @transaction.atomic
@@ -191,48 +176,53 @@ class ManageScanService:
         # Get papers with some but not all scanned fixed pages
         some_but_not_all_fixed_present = Paper.objects.filter(
             Exists(fixed_with_no_scan), Exists(fixed_with_scan)
-        ).prefetch_related(
-            Prefetch(
-                "fixedpage_set", queryset=FixedPage.objects.order_by("page_number")
-            ),
-            Prefetch(
-                "mobilepage_set",
-                queryset=MobilePage.objects.order_by("question_number"),
-            ),
-            "fixedpage_set__image",
-            "mobilepage_set__image",
         )
 
         incomplete = {}
-        for paper in some_but_not_all_fixed_present:
-            incomplete[paper.paper_number] = {"fixed": [], "mobile": []}
-            for fp in paper.fixedpage_set.all():
-                if fp.image:
-                    incomplete[paper.paper_number]["fixed"].append(
-                        {
-                            "status": "present",
-                            "page_number": fp.page_number,
-                            "img_pk": fp.image.pk,
-                        }
-                    )
-                else:
-                    incomplete[paper.paper_number]["fixed"].append(
-                        {
-                            "status": "missing",
-                            "page_number": fp.page_number,
-                        }
-                    )
-            for mp in paper.mobilepage_set.all():
-                incomplete[paper.paper_number]["mobile"].append(
+        for paper_number in some_but_not_all_fixed_present.values_list(
+            "paper_number", flat=True
+        ):
+            incomplete[paper_number] = {"fixed": [], "mobile": []}
+
+        # As in get_all_completed_test_papers, read just the columns we
+        # need rather than building page objects.  We stream the rows with
+        # iterator() so the pages are not also cached in the queryset.
+        fixed_pages = (
+            FixedPage.objects.filter(paper__in=some_but_not_all_fixed_present)
+            .order_by("page_number")
+            .values_list("paper__paper_number", "page_number", "image_id")
+        )
+        for paper_number, page_number, img_pk in fixed_pages.iterator():
+            if img_pk is not None:
+                incomplete[paper_number]["fixed"].append(
+                    {
+                        "status": "present",
+                        "page_number": page_number,
+                        "img_pk": img_pk,
+                    }
+                )
+            else:
+                incomplete[paper_number]["fixed"].append(
                     {
-                        "question_number": mp.question_number,
-                        "img_pk": mp.image.pk,
+                        "status": "missing",
+                        "page_number": page_number,
                     }
                 )
+        mobile_pages = (
+            MobilePage.objects.filter(paper__in=some_but_not_all_fixed_present)
+            .order_by("question_number")
+            .values_list("paper__paper_number", "question_number", "image_id")
+        )
+        for paper_number, question_number, img_pk in mobile_pages.iterator():
+            incomplete[paper_number]["mobile"].append(
+                {
+                    "question_number": question_number,
+                    "img_pk": img_pk,
+                }
+            )
 
         return incomplete
 
-    @transaction.atomic
     def get_number_incomplete_test_papers(self):
         """Return the number of test-papers that are partially but not completely scanned.
 
@@ -251,7 +241,6 @@ class ManageScanService:
 
         return some_but_not_all_fixed_present.count()
 
-    @transaction.atomic
     def get_number_unused_test_papers(self):
         """Return the number of test-papers that are usused.
 
@@ -268,7 +257,6 @@ class ManageScanService:
 
         return no_images_at_all.count()
 
-    @transaction.atomic
     def get_all_unused_test_papers(self):
         """Return a list of paper-numbers of all unused test-papers. Is sorted into paper-number order.
 
@@ -281,10 +269,9 @@ class ManageScanService:
         # Get papers with neither fixed-with-scan nor mobile-pages
         no_images_at_all = Paper.objects.filter(
             ~Exists(fixed_with_scan), mobilepage__isnull=True
-        )
-        return sorted([paper.paper_number for paper in no_images_at_all])
+        ).order_by("paper_number")
+        return list(no_images_at_all.values_list("paper_number", flat=True))
 
-    @transaction.atomic
     def get_all_used_test_papers(self):
         """Return a list of paper-numbers of all used test-papers. Is sorted into paper-number order.
 
@@ -301,7 +288,6 @@ class ManageScanService:
 
         return sorted([paper.paper_number for paper in has_some_image])
 
-    @transaction.atomic
     def get_page_image(self, test_paper, index):
         """Return a page-image.
 
@@ -309,8 +295,9 @@ class ManageScanService:
             test_paper (int): paper ID
             index (int): page number
         """
-        paper = Paper.objects.get(paper_number=test_paper)
-        page = FixedPage.objects.get(paper=paper, page_number=index)
+        page = FixedPage.objects.select_related("image").get(
+            paper__paper_number=test_paper, page_number=index
+        )
         return page.image
 
     def get_number_pushed_bundles(self):
@@ -321,17 +308,17 @@ class ManageScanService:
         """Return the number of uploaded, but not yet pushed, bundles."""
         return StagingBundle.objects.filter(pushed=False).count()
 
-    @transaction.atomic
     def get_pushed_bundles_list(self):
         """Return a list of all pushed bundles."""
         bundle_list = []
-        for bundle in Bundle.objects.all().prefetch_related(
+        # annotate with the image count so we don't need a query per bundle
+        for bundle in Bundle.objects.select_related(
             "staging_bundle", "user", "staging_bundle__user"
-        ):
+        ).annotate(n_pages=Count("image")):
             bundle_list.append(
                 {
                     "name": bundle.staging_bundle.slug,
-                    "pages": Image.objects.filter(bundle=bundle).count(),
+                    "pages": bundle.n_pages,
                     "when_pushed": arrow.get(bundle.time_of_last_update).humanize(),
                     "when_uploaded": arrow.get(
                         bundle.staging_bundle.time_of_last_update
@@ -356,26 +343,24 @@ class ManageScanService:
         except Image.DoesNotExist:
             raise ValueError("Cannot find an image with pk {img_pk}.")
 
-        if img.fixedpage_set.exists():  # linked by foreign key
-            fp_obj = FixedPage.objects.get(image=img)
+        # linked by foreign key: fetch the page (and its paper) at most once
+        # rather than first checking for existence and then querying again.
+        fp_obj = img.fixedpage_set.select_related("paper").first()
+        if fp_obj is not None:
             return {
                 "page_type": "fixed",
                 "paper_number": fp_obj.paper.paper_number,
                 "page_number": fp_obj.page_number,
             }
-        elif img.mobilepage_set.exists():  # linked by foreign key
+        mp_list = list(
+            img.mobilepage_set.values_list("paper__paper_number", "question_number")
+        )
+        if mp_list:  # linked by foreign key
             # check the first such mobile page to get the paper_number
-            paper_number = (
-                MobilePage.objects.filter(image=img).first().paper.paper_number
-            )
-            q_list = [
-                mp_obj.question_number
-                for mp_obj in MobilePage.objects.filter(image=img)
-            ]
             return {
                 "page_type": "mobile",
-                "paper_number": paper_number,
-                "question_list": q_list,
+                "paper_number": mp_list[0][0],
+                "question_list": [q for _, q in mp_list],
             }
         elif img.discardpage:  # linked by one-to-one
             return {"page_type": "discard", "reason": img.discardpage.discard_reason}
@@ -384,13 +369,12 @@ class ManageScanService:
                 "Cannot determine what sort of page image {img_pk} is attached to."
             )
 
-    @transaction.atomic
     def get_discarded_images(self):
         discards = []
 
         for img in (
             Image.objects.filter(discardpage__isnull=False)
-            .prefetch_related("discardpage", "bundle", "bundle__staging_bundle")
+            .select_related("discardpage", "bundle", "bundle__staging_bundle")
             .order_by("bundle", "bundle_order")
         ):
             discards.append(
@@ -437,10 +421,8 @@ class ManageScanService:
                 "page_number": fp_obj.page_number,
                 "page_pk": fp_obj.pk,
             }
-            if fp_obj.image:
-                dat.update({"image": fp_obj.image.pk})
-            else:
-                dat.update({"image": None})
+            # image_id is None if there is no image
+            dat.update({"image": fp_obj.image_id})
             page_images.append(dat)
         for mp_obj in paper_obj.mobilepage_set.all().order_by("question_number"):
             dat = {
@@ -448,12 +430,11 @@ class ManageScanService:
                 "question_number": mp_obj.question_number,
                 "page_pk": mp_obj.pk,
             }
-            dat.update({"image": mp_obj.image.pk})
+            dat.update({"image": mp_obj.image_id})
             page_images.append(dat)
 
         return page_images
 
-    @transaction.atomic
     def get_papers_missing_fixed_pages(self):
         """Return a list of the missing fixed pages in papers.
 
@@ -472,18 +453,19 @@ class ManageScanService:
         # Get papers with some but not all scanned fixed pages
         some_but_not_all_fixed_present = Paper.objects.filter(
             Exists(fixed_with_no_scan), Exists(fixed_with_scan)
-        ).prefetch_related(
-            Prefetch(
-                "fixedpage_set", queryset=FixedPage.objects.order_by("page_number")
-            ),
-            "fixedpage_set__image",
         )
-        missing_paper_fixed_pages = []
-        for paper in some_but_not_all_fixed_present:
-            dat = []
-            for fp in paper.fixedpage_set.all():
-                if not fp.image:
-                    dat.append(fp.page_number)
-            missing_paper_fixed_pages.append((paper.paper_number, dat))
-
-        return missing_paper_fixed_pages
+        # Let the database pick out just the missing pages of those
+        # papers, rather than fetching every page (and image) and
+        # filtering here.  Each such paper has at least one missing page.
+        missing_pages = (
+            FixedPage.objects.filter(
+                paper__in=some_but_not_all_fixed_present, image__isnull=True
+            )
+            .order_by("paper__paper_number", "page_number")
+            .values_list("paper__paper_number", "page_number")
+        )
+        missing_paper_fixed_pages = {}
+        for paper_number, page_number in missing_pages:
+            missing_paper_fixed_pages.setdefault(paper_number, []).append(page_number)
+
+        return list(missing_paper_fixed_pages.items())
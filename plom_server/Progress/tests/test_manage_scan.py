@@ -3,6 +3,7 @@
 # Copyright (C) 2022 Brennen Chiu
 # Copyright (C) 2023 Andrew Rechnitzer
 
+from django.contrib.auth.models import User
 from django.test import TestCase
 from django.conf import settings
 from model_bakery import baker
@@ -127,6 +128,13 @@ class ManageScanTests(TestCase):
         mss = ManageScanService()
         assert mss.get_all_unused_test_papers() == [8, 9]
 
+    def test_get_papers_missing_fixed_pages(self):
+        mss = ManageScanService()
+        self.assertEqual(
+            mss.get_papers_missing_fixed_pages(),
+            [(pn, [3, 4, 5, 6]) for pn in [6, 7, 10, 11]],
+        )
+
     def test_get_all_incomplete_test_papers(self):
         mss = ManageScanService()
         mss_incomplete = mss.get_all_incomplete_test_papers()
@@ -220,3 +228,18 @@ class ManageScanTests(TestCase):
                 assert (
                     "img_pk" in m_page_data[qn - 1]
                 )  # not testing the actual value of image_pk
+
+    def test_get_pushed_bundles_list(self):
+        user = baker.make(User, username="scanner")
+        self.bundle.user = user
+        self.bundle.staging_bundle = baker.make(StagingBundle, slug="foo", user=user)
+        self.bundle.save()
+        n_images = Image.objects.filter(bundle=self.bundle).count()
+
+        mss = ManageScanService()
+        bundle_list = mss.get_pushed_bundles_list()
+        assert len(bundle_list) == 1
+        self.assertEqual(bundle_list[0]["name"], "foo")
+        self.assertEqual(bundle_list[0]["pages"], n_images)
+        self.assertEqual(bundle_list[0]["who_pushed"], "scanner")
+        self.assertEqual(bundle_list[0]["who_uploaded"], "scanner")
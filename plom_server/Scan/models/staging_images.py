@@ -41,6 +41,12 @@ class StagingImage(models.Model):
     pushed = models.BooleanField(default=False)
     image_type = models.TextField(choices=ImageTypeChoices.choices, default=UNREAD)
 
+    class Meta:
+        indexes = [
+            # images are very often looked up by their position in a bundle
+            models.Index(fields=["bundle", "bundle_order"]),
+        ]
+
 
 class StagingThumbnail(models.Model):
     def _staging_thumbnail_upload_path(self, filename):
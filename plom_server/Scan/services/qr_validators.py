@@ -45,7 +45,17 @@ class QRErrorService:
         img_bundle_order = {}
 
         with transaction.atomic():
-            images = bundle.stagingimage_set.all()
+            images = list(bundle.stagingimage_set.all())
+            # look up the versions of all pages of all the papers in this
+            # bundle at once, rather than one query per page image.
+            page_versions = PaperInfoService().get_page_versions(
+                {
+                    qr["page_info"]["paper_id"]
+                    for img in images
+                    for qr in img.parsed_qr.values()
+                    if "page_info" in qr
+                }
+            )
             for img in images:
                 if len(img.parsed_qr) == 0:
                     # no qr-codes found.
@@ -55,7 +65,9 @@ class QRErrorService:
                 try:
                     self.check_consistent_qr(img.parsed_qr)
                     self.check_qr_against_spec_and_qvmap(
-                        img.parsed_qr, spec_dictionary["publicCode"]
+                        img.parsed_qr,
+                        spec_dictionary["publicCode"],
+                        page_versions=page_versions,
                     )
                     tpv = self.get_tpv(img.parsed_qr)
                     if tpv == "plomX":  # is an extra page
@@ -91,53 +103,70 @@ class QRErrorService:
 
         with transaction.atomic():
             # save all the known images that are not collisions.
+            # Set the image-types with one targeted UPDATE per type, rather
+            # than loading and saving every image individually.
+            known_pks = [
+                img_list[0] for img_list in known_imgs.values() if len(img_list) == 1
+            ]
+            StagingImage.objects.filter(pk__in=known_pks).update(
+                image_type=StagingImage.KNOWN
+            )
+            # create the corresponding typed rows in one bulk insert per type.
+            known_rows = []
             for tpv, img_list in known_imgs.items():
                 if len(img_list) > 1:
                     # this indicates a collision, and so handled by error-images
                     continue
-                img = StagingImage.objects.get(pk=img_list[0])
-                img.image_type = StagingImage.KNOWN
-                img.save()
                 (
                     test_paper,
                     page_number,
                     version,
                 ) = parse_paper_page_version(tpv)
-
-                KnownStagingImage.objects.create(
-                    staging_image=img,
-                    paper_number=test_paper,
-                    page_number=page_number,
-                    version=version,
+                known_rows.append(
+                    KnownStagingImage(
+                        staging_image_id=img_list[0],
+                        paper_number=test_paper,
+                        page_number=page_number,
+                        version=version,
+                    )
                 )
+            KnownStagingImage.objects.bulk_create(known_rows)
             # save all the images with no-qrs.
-            for k in no_qr_imgs:
-                img = StagingImage.objects.get(pk=k)
-                img.image_type = StagingImage.UNKNOWN
-                img.save()
-                UnknownStagingImage.objects.create(staging_image=img)
+            StagingImage.objects.filter(pk__in=no_qr_imgs).update(
+                image_type=StagingImage.UNKNOWN
+            )
+            UnknownStagingImage.objects.bulk_create(
+                [UnknownStagingImage(staging_image_id=k) for k in no_qr_imgs]
+            )
             # save all the extra-pages.
-            for k in extra_imgs:
-                img = StagingImage.objects.get(pk=k)
-                img.image_type = StagingImage.EXTRA
-                img.save()
-                ExtraStagingImage.objects.create(staging_image=img)
+            StagingImage.objects.filter(pk__in=extra_imgs).update(
+                image_type=StagingImage.EXTRA
+            )
+            ExtraStagingImage.objects.bulk_create(
+                [ExtraStagingImage(staging_image_id=k) for k in extra_imgs]
+            )
             # save all the scrap-paper pages.
-            for k in scrap_imgs:
-                img = StagingImage.objects.get(pk=k)
-                img.image_type = StagingImage.DISCARD
-                img.save()
-                DiscardStagingImage.objects.create(
-                    staging_image=img, discard_reason="Scrap paper"
-                )
+            StagingImage.objects.filter(pk__in=scrap_imgs).update(
+                image_type=StagingImage.DISCARD
+            )
+            DiscardStagingImage.objects.bulk_create(
+                [
+                    DiscardStagingImage(
+                        staging_image_id=k, discard_reason="Scrap paper"
+                    )
+                    for k in scrap_imgs
+                ]
+            )
             # save all the error-pages with the error string
-            for k, err_str in error_imgs:
-                img = StagingImage.objects.get(pk=k)
-                img.image_type = StagingImage.ERROR
-                img.save()
-                ErrorStagingImage.objects.create(
-                    staging_image=img, error_reason=err_str
-                )
+            StagingImage.objects.filter(pk__in=[k for k, _ in error_imgs]).update(
+                image_type=StagingImage.ERROR
+            )
+            ErrorStagingImage.objects.bulk_create(
+                [
+                    ErrorStagingImage(staging_image_id=k, error_reason=err_str)
+                    for k, err_str in error_imgs
+                ]
+            )
 
     def check_consistent_qr(self, parsed_qr_dict):
         """Check the parsed qr-codes: confirm they are self-consistent and that the publicCode matches the test spec.
@@ -158,45 +187,54 @@ class QRErrorService:
 
         def is_list_inconsistent(lst):
             """Helper function to test data consistency."""
-            return any([X != lst[0] for X in lst])
+            return len(set(lst)) > 1
 
         # check all page-types are the same
-        page_types = [parsed_qr_dict[x]["page_type"] for x in parsed_qr_dict]
+        page_types = [qr["page_type"] for qr in parsed_qr_dict.values()]
         if is_list_inconsistent(page_types):
             raise ValueError("Inconsistent qr-codes - check scan for folded pages")
         # if it is an extra page or scrap-paper, then no further consistency checks
         if page_types[0] in ["plom_extra", "plom_scrap"]:
             return True
-        # must be a normal qr-coded plom-page - so make sure public-code is consistent
+        # must be a normal qr-coded plom-page: walk the qr-codes once, pulling
+        # out all the fields we need, and then transpose into one list per field.
+        codes, paper_ids, page_nums, version_nums, tpvs = zip(
+            *[
+                (
+                    qr["page_info"]["public_code"],
+                    qr["page_info"]["paper_id"],
+                    qr["page_info"]["page_num"],
+                    qr["page_info"]["version_num"],
+                    qr["tpv"],
+                )
+                for qr in parsed_qr_dict.values()
+            ]
+        )
+        # make sure public-code is consistent
         # note - this does not check the code against that given by the spec.
-        codes = [parsed_qr_dict[x]["page_info"]["public_code"] for x in parsed_qr_dict]
         if is_list_inconsistent(codes):
             raise ValueError(
                 "Inconsistent public-codes - was a page from a different assessment uploaded?"
             )
         # check all the same paper_id
-        if is_list_inconsistent(
-            [parsed_qr_dict[x]["page_info"]["paper_id"] for x in parsed_qr_dict]
-        ):
+        if is_list_inconsistent(paper_ids):
             raise ValueError("Inconsistent paper-numbers - check scan for folded pages")
         # check all the same page_number
-        if is_list_inconsistent(
-            [parsed_qr_dict[x]["page_info"]["page_num"] for x in parsed_qr_dict]
-        ):
+        if is_list_inconsistent(page_nums):
             raise ValueError("Inconsistent page-numbers - check scan for folded pages")
         # check all the same version_number
-        if is_list_inconsistent(
-            [parsed_qr_dict[x]["page_info"]["version_num"] for x in parsed_qr_dict]
-        ):
+        if is_list_inconsistent(version_nums):
             raise ValueError(
                 "Inconsistent version-numbers - check scan for folded pages"
             )
         # check all the same tpv - this **should** not be triggered because of previous checks
-        if is_list_inconsistent([parsed_qr_dict[x]["tpv"] for x in parsed_qr_dict]):
+        if is_list_inconsistent(tpvs):
             raise ValueError("Inconsistent tpv - check scan for folded pages")
         # check that the version in the qr-code matches the question-version-map in the system.
 
-    def check_qr_against_spec_and_qvmap(self, parsed_qr_dict, correct_public_code):
+    def check_qr_against_spec_and_qvmap(
+        self, parsed_qr_dict, correct_public_code, *, page_versions=None
+    ):
         """Check the info in the qr-code against the spec and the qv-map in the database.
 
         More precisely, check that the
@@ -209,6 +247,12 @@ class QRErrorService:
            * this should only be called after qr-code consistency checks
            * if the page is an extra, scrap or unknown page then this test simply returns "True".
 
+        Keyword Args:
+            page_versions (dict/None): optional precomputed dict of the
+                versions of ``(paper_number, page_number)`` pairs, as
+                returned by ``PaperInfoService.get_page_versions``.  If
+                omitted, the database is queried for this page.
+
         Returns None if all good, else raises various ValueError describing the errors.
         """
         if len(parsed_qr_dict) == 0:
@@ -224,9 +268,19 @@ class QRErrorService:
             )
 
         v_on_page = qr_info["page_info"]["version_num"]
-        v_in_db = PaperInfoService().get_version_from_paper_page(
-            qr_info["page_info"]["paper_id"], qr_info["page_info"]["page_num"]
-        )
+        paper_number = qr_info["page_info"]["paper_id"]
+        page_number = qr_info["page_info"]["page_num"]
+        if page_versions is None:
+            v_in_db = PaperInfoService().get_version_from_paper_page(
+                paper_number, page_number
+            )
+        else:
+            try:
+                v_in_db = page_versions[(paper_number, page_number)]
+            except KeyError:
+                raise ValueError(
+                    f"Page {page_number} of paper {paper_number} does not exist in the database."
+                )
         if v_on_page != v_in_db:
             raise ValueError(
                 f"Version of paper/page in qr-code = {v_on_page} does not match version in database = {v_in_db}"
@@ -12,7 +12,6 @@ from statistics import mode
 import tempfile
 from typing import Dict, Any
 
-from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files import File
 from django.core.exceptions import ObjectDoesNotExist
@@ -372,29 +371,24 @@ class ScanService:
         # ++++++++++++++++++++++
 
         groupings = {}
-        # TODO - simplify this loop using enumerate(list) or similar.
-        for page in range(len(list_qr_codes)):
-            for quadrant in list_qr_codes[page]:
+        for qr_codes in list_qr_codes:
+            for quadrant, qr in qr_codes.items():
                 # note that from legacy-scan code the tpv_signature is the full raw "TTTTTPPPVVVOCCCCC" qr-string
                 # while tpv refers to "TTTTTPPPVVV"
-                raw_qr_string = list_qr_codes[page][quadrant].get("tpv_signature", None)
+                raw_qr_string = qr.get("tpv_signature", None)
                 if raw_qr_string is None:
                     continue
-                x_coord = list_qr_codes[page][quadrant].get("x")
-                y_coord = list_qr_codes[page][quadrant].get("y")
                 qr_code_dict = {
                     "raw_qr_string": raw_qr_string,
-                    "x_coord": x_coord,
-                    "y_coord": y_coord,
+                    "x_coord": qr.get("x"),
+                    "y_coord": qr.get("y"),
                 }
 
                 if isValidTPV(raw_qr_string):
                     paper_id, page_num, version_num, public_code, corner = parseTPV(
                         raw_qr_string
                     )
-                    tpv = getPaperPageVersion(
-                        list_qr_codes[page][quadrant].get("tpv_signature")
-                    )
+                    tpv = getPaperPageVersion(raw_qr_string)
                     qr_code_dict.update(
                         {
                             "page_type": "plom_qr",
@@ -446,9 +440,6 @@ class ScanService:
         Args:
             bundle_pk: primary key of bundle DB object
         """
-        root_folder = settings.MEDIA_ROOT / "page_images"
-        root_folder.mkdir(exist_ok=True)
-
         bundle_obj = StagingBundle.objects.get(pk=bundle_pk)
         # check that the qr-codes have not been read already, or that a task has not been set
 
@@ -479,9 +470,6 @@ class ScanService:
         Returns:
             None
         """
-        root_folder = settings.MEDIA_ROOT / "page_images"
-        root_folder.mkdir(exist_ok=True)
-
         bundle_obj = StagingBundle.objects.get(pk=bundle_pk)
 
         # TODO: assert the length of question is same as pages in bundle
@@ -550,8 +538,7 @@ class ScanService:
 
     def get_n_pushed_images(self, bundle):
         """Return the number of staging images that have been pushed."""
-        pushed = StagingImage.objects.filter(bundle=bundle, pushed=True)
-        return len(pushed)
+        return StagingImage.objects.filter(bundle=bundle, pushed=True).count()
 
     @transaction.atomic
     def get_all_known_images(self, bundle):
@@ -569,8 +556,7 @@ class ScanService:
 
     @transaction.atomic
     def get_n_pushed_bundles(self):
-        pushed_bundles = StagingBundle.objects.filter(pushed=True)
-        return len(pushed_bundles)
+        return StagingBundle.objects.filter(pushed=True).count()
 
     @transaction.atomic
     def get_n_known_images(self, bundle):
@@ -12,7 +12,6 @@ import arrow
 from django.shortcuts import render
 from django.http import HttpResponseRedirect, Http404, FileResponse
 from django.urls import reverse
-from django.utils import timezone
 from django_htmx.http import HttpResponseClientRefresh
 
 from Base.base_group_views import ScannerRequiredView
@@ -50,7 +49,8 @@ class ScannerHomeView(ScannerRequiredView):
         staged_bundles = []
         pushed_bundles = []
         for bundle in user_bundles:
-            date_time = timezone.make_aware(datetime.fromtimestamp(bundle.timestamp))
+            # arrow takes the POSIX timestamp directly
+            time_uploaded = arrow.get(bundle.timestamp).humanize()
             if bundle.has_page_images:
                 cover_img_rotation = scanner.get_first_image(bundle).rotation
             else:
@@ -61,7 +61,7 @@ class ScannerHomeView(ScannerRequiredView):
                     {
                         "slug": bundle.slug,
                         "timestamp": bundle.timestamp,
-                        "time_uploaded": arrow.get(date_time).humanize(),
+                        "time_uploaded": time_uploaded,
                         "pages": pages,
                         "cover_angle": cover_img_rotation,
                     }
@@ -71,7 +71,7 @@ class ScannerHomeView(ScannerRequiredView):
                     {
                         "slug": bundle.slug,
                         "timestamp": bundle.timestamp,
-                        "time_uploaded": arrow.get(date_time).humanize(),
+                        "time_uploaded": time_uploaded,
                         "pages": pages,
                         "cover_angle": cover_img_rotation,
                     }
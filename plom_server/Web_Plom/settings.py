@@ -86,7 +86,6 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "Web_Plom.middleware.OnlineNowMiddleware",
     "django_session_timeout.middleware.SessionTimeoutMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
 ]
 
 ROOT_URLCONF = "Web_Plom.urls"
@@ -125,6 +124,8 @@ DATABASES = {
         "PASSWORD": "postgres",
         "HOST": plom_db_host,
         "PORT": "5432",
+        # keep connections open between requests, rather than reconnecting each time
+        "CONN_MAX_AGE": 60,
     },
     "sqlite": {
         "ENGINE": "django.db.backends.sqlite3",
@@ -247,8 +248,8 @@ FIXTURE_DIRS = [BASE_DIR / "fixtures"]
 # Configurable variables for Web Plom
 # ----------------------------------------------
 
-# Max file size for bundle uploads (1 GB for now)
-MAX_BUNDLE_SIZE = 1e9
+# Max file size for bundle uploads in bytes (1 GB for now)
+MAX_BUNDLE_SIZE = 1_000_000_000
 
 # Max file size for a single file upload (1 MB for now)
 # MAX_FILE_SIZE = 1e6